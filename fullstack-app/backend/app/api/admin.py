@@ -0,0 +1,103 @@
+"""
+Admin API routes
+"""
+import asyncio
+import re
+import secrets
+from pathlib import Path
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.schemas import ModelReloadRequest, ModelReloadResponse, ProfileRequest, ProfileResponse
+from app.services.profiling import ProfilingBusy
+from app.services.translation import translation_service
+from app.services.versions import ReloadInProgress
+
+logger = get_logger(__name__)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Allow the request only with the configured admin token"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post(
+    "/reload",
+    response_model=ModelReloadResponse,
+    summary="Hot reload the model",
+    description="Load and warm up a new model version, switch traffic to it and free the old one"
+)
+async def reload_model(request: Optional[ModelReloadRequest] = None) -> ModelReloadResponse:
+    """Hot model reload endpoint"""
+    model_path = request.model_path if request else None
+    logger.info(f"Reloading model from {model_path or translation_service.model_path}")
+
+    try:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, translation_service.reload_model, model_path)
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        # The previous version keeps serving
+        logger.error(f"Model reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+
+    return ModelReloadResponse(**result)
+
+
+@router.post(
+    "/profile",
+    response_model=ProfileResponse,
+    summary="Profile live traffic",
+    description="Run the torch profiler and Python sampling around tokenize, generate and decode "
+                "for a bounded window and return the top operators"
+)
+async def profile(request: Optional[ProfileRequest] = None) -> ProfileResponse:
+    """On-demand profiling endpoint"""
+    request = request or ProfileRequest()
+    if request.duration_s > settings.PROFILE_MAX_DURATION_S:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration_s may not exceed {settings.PROFILE_MAX_DURATION_S}"
+        )
+    
+    try:
+        loop = asyncio.get_event_loop()
+        summary = await loop.run_in_executor(
+            None,
+            lambda: translation_service.profiler.run(
+                request.duration_s,
+                max_requests=request.max_requests,
+                sample_interval_s=request.sample_interval_ms / 1000,
+                top=request.top
+            )
+        )
+    except ProfilingBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Profiling failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Profiling failed: {e}")
+    
+    return ProfileResponse(**summary)
+
+
+@router.get(
+    "/profile/{session_id}/trace",
+    summary="Download a profiling trace",
+    description="Chrome trace of a finished profiling session, for chrome://tracing or Perfetto"
+)
+async def profile_trace(session_id: str) -> FileResponse:
+    """Profiling trace download endpoint"""
+    trace = Path(settings.PROFILE_DIR) / f"profile-{session_id}.json"
+    if not re.fullmatch(r"[\w-]+", session_id) or not trace.is_file():
+        raise HTTPException(status_code=404, detail="Unknown profiling session")
+    return FileResponse(trace, media_type="application/json", filename=trace.name)
@@ -1,9 +1,11 @@
 """
 Translation API routes
 """
+import asyncio
+import functools
 import time
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import Any, Callable, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import (
@@ -16,6 +18,9 @@ from app.models.schemas import (
     SupportedLanguagesResponse,
     LanguageInfo
 )
+from app.core.config import settings
+from app.services.admission import AdmissionRejected
+from app.services.cancellation import CancellationToken, RequestCancelled
 from app.services.translation import translation_service
 from app.core.logging import get_logger
 
@@ -23,13 +28,37 @@ logger = get_logger(__name__)
 router = APIRouter()
 
 
+def _cancellation_token(timeout_ms: Optional[int]) -> CancellationToken:
+    """Token with the tighter of the request's own and the server's deadline"""
+    timeouts = [t for t in (timeout_ms / 1000 if timeout_ms else None, settings.REQUEST_TIMEOUT_S) if t]
+    return CancellationToken(min(timeouts) if timeouts else None)
+
+
+async def _run_cancellable(request: Request, token: CancellationToken, func: Callable, **kwargs: Any) -> Any:
+    """Run func in a worker thread, cancelling token if the client disconnects"""
+    loop = asyncio.get_event_loop()
+    future = loop.run_in_executor(None, functools.partial(func, **kwargs))
+    while not future.done():
+        done, _ = await asyncio.wait({future}, timeout=settings.DISCONNECT_POLL_INTERVAL_S)
+        if not done and token.reason is None and await request.is_disconnected():
+            logger.info("Client disconnected, cancelling its generation")
+            token.cancel("disconnect")
+    return future.result()
+
+
+def _cancelled_response(error: RequestCancelled) -> HTTPException:
+    """504 for a missed deadline, 499 (client closed request) for a disconnect"""
+    logger.warning(f"Translation cancelled: {error.reason}")
+    return HTTPException(status_code=504 if error.reason == "deadline" else 499, detail=str(error))
+
+
 @router.post(
     "/translate",
     response_model=TranslationResponse,
     summary="Translate text",
     description="Translate text from source language to target language"
 )
-async def translate_text(request: TranslationRequest) -> TranslationResponse:
+async def translate_text(request: TranslationRequest, http_request: Request) -> TranslationResponse:
     """Translate text endpoint"""
     try:
         if not translation_service.is_ready():
@@ -38,17 +67,32 @@ async def translate_text(request: TranslationRequest) -> TranslationResponse:
                 detail="Translation service not ready. Model is still loading."
             )
         
-        result = translation_service.translate(
+        token = _cancellation_token(request.timeout_ms)
+        result = await _run_cancellable(
+            http_request,
+            token,
+            translation_service.translate,
             text=request.text,
             source_lang=request.source_language,
             target_lang=request.target_language,
             num_beams=request.num_beams,
-            max_length=request.max_length
+            max_length=request.max_length,
+            num_return_sequences=request.num_return_sequences,
+            return_scores=request.return_scores,
+            cancellation=token
         )
         
         logger.info(f"Translated text: {request.text[:50]}...")
         return result
         
+    except HTTPException:
+        raise
+    except RequestCancelled as e:
+        raise _cancelled_response(e)
+    except AdmissionRejected as e:
+        logger.warning(f"Translation rejected by admission control: {e}")
+        # A request too large for the whole budget fails the same way on every retry
+        raise HTTPException(status_code=413 if e.reason == "too_large" else 503, detail=str(e))
     except Exception as e:
         logger.error(f"Translation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -60,7 +104,7 @@ async def translate_text(request: TranslationRequest) -> TranslationResponse:
     summary="Translate multiple texts",
     description="Translate multiple texts in a single request"
 )
-async def translate_batch(request: BatchTranslationRequest) -> BatchTranslationResponse:
+async def translate_batch(request: BatchTranslationRequest, http_request: Request) -> BatchTranslationResponse:
     """Batch translation endpoint"""
     try:
         if not translation_service.is_ready():
@@ -71,13 +115,22 @@ async def translate_batch(request: BatchTranslationRequest) -> BatchTranslationR
         
         start_time = time.time()
         
-        results = translation_service.translate_batch(
+        token = _cancellation_token(request.timeout_ms)
+        results = await _run_cancellable(
+            http_request,
+            token,
+            translation_service.translate_batch,
             texts=request.texts,
             source_lang=request.source_language,
             target_lang=request.target_language,
             num_beams=request.num_beams,
-            max_length=request.max_length
+            max_length=request.max_length,
+            num_return_sequences=request.num_return_sequences,
+            return_scores=request.return_scores,
+            cancellation=[token] * len(request.texts)
         )
+        if token.reason is not None:
+            raise token.error()
         
         total_time = (time.time() - start_time) * 1000
         
@@ -88,6 +141,8 @@ async def translate_batch(request: BatchTranslationRequest) -> BatchTranslationR
             total_processing_time_ms=total_time
         )
         
+    except RequestCancelled as e:
+        raise _cancelled_response(e)
     except Exception as e:
         logger.error(f"Batch translation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -107,7 +162,8 @@ async def health_check() -> HealthResponse:
         status="healthy" if translation_service.is_ready() else "loading",
         version="1.0.0",
         model_loaded=translation_service.is_ready(),
-        model_info=model_info
+        model_info=model_info,
+        memory=translation_service.memory_budget.snapshot()
     )
 
 
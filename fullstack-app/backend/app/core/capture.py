@@ -0,0 +1,116 @@
+"""
+Opt-in capture of translation traffic for app.tools.replay
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CAPTURED_PATHS = ("/api/v1/translate", "/api/v1/translate/batch")
+
+# Request fields kept in the log, so a record can be posted back as is
+REQUEST_FIELDS = (
+    "source_language",
+    "target_language",
+    "num_beams",
+    "max_length",
+    "timeout_ms",
+    "num_return_sequences",
+    "return_scores"
+)
+
+
+class TrafficCapture:
+    """Appends one compact JSON line per translation request"""
+    
+    def __init__(self, path: str, redact: bool = False):
+        self.path = Path(path)
+        self.redact = redact
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Capturing translation traffic to {self.path}{' (redacted)' if redact else ''}")
+    
+    def build_record(self, path: str, body: bytes, status: int, arrived: float, latency_ms: float) -> Dict[str, Any]:
+        """Shape and timing of one request; text is replaced by its length when redacting"""
+        record: Dict[str, Any] = {
+            "ts": round(arrived, 3),
+            "path": path,
+            "status": status,
+            "latency_ms": round(latency_ms, 1)
+        }
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            record["body_bytes"] = len(body)
+            return record
+        if not isinstance(payload, dict):
+            return record
+        
+        texts = payload.get("texts") if "texts" in payload else [payload.get("text") or ""]
+        texts = [str(text) for text in texts or []]
+        if self.redact:
+            record["lengths"] = [len(text) for text in texts]
+        else:
+            record["texts"] = texts
+        for field in REQUEST_FIELDS:
+            if payload.get(field) is not None:
+                record[field] = payload[field]
+        return record
+    
+    def record(self, path: str, body: bytes, status: int, arrived: float, latency_ms: float) -> None:
+        line = json.dumps(
+            self.build_record(path, body, status, arrived, latency_ms),
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        # One write per line keeps appends from several workers intact
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class CaptureMiddleware:
+    """ASGI middleware that hands translation requests to a TrafficCapture
+    
+    Works on the raw ASGI messages so the request body is observed as it
+    streams to the endpoint instead of being read twice.
+    """
+    
+    def __init__(self, app: Any, capture: TrafficCapture):
+        self.app = app
+        self.capture = capture
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] not in CAPTURED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        arrived = time.time()
+        start = time.perf_counter()
+        body = bytearray()
+        status: Optional[int] = None
+        
+        async def capture_receive() -> Dict[str, Any]:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+        
+        async def capture_send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            try:
+                self.capture.record(scope["path"], bytes(body), status or 500, arrived, latency_ms)
+            except Exception as e:
+                logger.warning(f"Failed to capture request: {e}")
@@ -36,9 +36,50 @@ class Settings(BaseSettings):
     
     # Model Settings
     MODEL_PATH: str = "./saved_model"
+    RELOAD_DRAIN_TIMEOUT_S: float = 60.0
     MAX_INPUT_LENGTH: int = 512
     MAX_OUTPUT_LENGTH: int = 512
     DEFAULT_NUM_BEAMS: int = 4
+    BATCH_SIZE: int = 8
+    QUANTIZATION: Optional[str] = None  # "dynamic" for int8 dynamic quantization on CPU
+    GENERATION_MODE: str = "eager"  # "static" for static KV caches and a compiled decoder step
+    STATIC_BATCH_BUCKETS: list[int] = [1, 4, 8]
+    STATIC_INPUT_BUCKETS: list[int] = [32, 128]
+    STATIC_OUTPUT_BUCKETS: list[int] = [128, 512]  # 512 covers the API's default max_length
+    STATIC_NUM_BEAMS: list[int] = [4]
+    MASK_UNTRANSLATABLE: bool = False  # Keep URLs, emails, numbers, code and target-script text verbatim
+    
+    # Admission Control (MEMORY_BUDGET_MB unset = 70% of free memory at startup)
+    MEMORY_BUDGET_MB: Optional[int] = None
+    ADMISSION_TIMEOUT_S: float = 30.0
+    
+    # Cancellation (requests can shorten REQUEST_TIMEOUT_S with timeout_ms)
+    REQUEST_TIMEOUT_S: Optional[float] = None
+    DISCONNECT_POLL_INTERVAL_S: float = 0.1
+    
+    # CPU Settings (unset values fall back to TUNING_FILE, then torch defaults)
+    WORKERS: int = 1
+    TORCH_NUM_THREADS: Optional[int] = None
+    TORCH_INTEROP_THREADS: Optional[int] = None
+    CPU_AFFINITY: Optional[str] = None  # "cores" or "numa" to pin each worker
+    TUNING_FILE: str = "./tuning.json"
+    
+    # Gateway Settings (app.gateway.main)
+    GATEWAY_HOST: str = "0.0.0.0"
+    GATEWAY_PORT: int = 8080
+    GATEWAY_REPLICAS: list[str] = []  # Replica base URLs, e.g. ["http://127.0.0.1:8001"]
+    GATEWAY_HEALTH_INTERVAL_S: float = 2.0
+    GATEWAY_MAX_RETRIES: int = 2
+    GATEWAY_REQUEST_TIMEOUT_S: float = 120.0
+    GATEWAY_STICKY_SLACK: float = 2.0  # Extra load, in request costs, accepted to keep sticky routing
+    
+    # Traffic Capture (played back with app.tools.replay)
+    CAPTURE_FILE: Optional[str] = None  # JSONL log of translation requests, off while unset
+    CAPTURE_REDACT: bool = False  # Log text lengths instead of text
+    
+    # Profiling (admin endpoint)
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_DURATION_S: float = 120.0
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -48,6 +89,7 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
+    ADMIN_TOKEN: Optional[str] = None  # Admin endpoints are disabled while unset
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # Logging
@@ -0,0 +1,194 @@
+"""
+CPU threading and affinity configuration
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+AFFINITY_MODES = ("cores", "numa")
+
+# (slot, lock file handle) that keeps this process's worker slot claimed
+_slot_lock = None
+_applied: Optional[Dict[str, Any]] = None
+
+
+def load_tuning(path: str) -> Dict[str, Any]:
+    """Load a tuning file written by app.tools.tune_threads, empty if missing"""
+    tuning_path = Path(path)
+    if not tuning_path.is_file():
+        return {}
+    try:
+        with open(tuning_path, encoding="utf-8") as f:
+            return json.load(f).get("best", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tuning file {tuning_path}: {e}")
+        return {}
+
+
+def tuned_cpu_settings() -> Dict[str, Any]:
+    """CPU settings where the tuning file fills in anything not set explicitly"""
+    tuning = load_tuning(settings.TUNING_FILE)
+    explicit = settings.model_fields_set
+    
+    def pick(field: str, key: str) -> Any:
+        if field in explicit or key not in tuning:
+            return getattr(settings, field)
+        return tuning[key]
+    
+    return {
+        "workers": pick("WORKERS", "workers"),
+        "num_threads": pick("TORCH_NUM_THREADS", "threads_per_worker"),
+        "interop_threads": pick("TORCH_INTEROP_THREADS", "interop_threads"),
+        "affinity": pick("CPU_AFFINITY", "affinity"),
+        "batch_size": pick("BATCH_SIZE", "batch_size")
+    }
+
+
+def parse_cpulist(cpulist: str) -> List[int]:
+    """Parse a kernel cpulist such as '0-3,8,10-11'"""
+    cpus: List[int] = []
+    for part in filter(None, (p.strip() for p in cpulist.split(","))):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes() -> List[List[int]]:
+    """CPUs of each NUMA node restricted to available CPUs, a single node if unknown"""
+    allowed = set(available_cpus())
+    nodes = []
+    for node_dir in sorted(Path("/sys/devices/system/node").glob("node[0-9]*")):
+        try:
+            cpus = [cpu for cpu in parse_cpulist((node_dir / "cpulist").read_text()) if cpu in allowed]
+        except OSError:
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(allowed)]
+
+
+def claim_worker_slot(num_slots: int) -> int:
+    """Return this worker's index among num_slots workers on the host
+    
+    WORKER_INDEX is used when the launcher sets it. Otherwise the first free
+    slot is claimed with an exclusive lock file that is held for the lifetime
+    of the process, so restarted workers reuse the slot of the one they replace.
+    """
+    global _slot_lock
+    if "WORKER_INDEX" in os.environ:
+        return int(os.environ["WORKER_INDEX"]) % max(num_slots, 1)
+    if _slot_lock is not None:
+        return _slot_lock[0]
+    
+    try:
+        import fcntl
+    except ImportError:
+        return 0
+    
+    lock_dir = Path(tempfile.gettempdir())
+    for slot in range(num_slots):
+        handle = open(lock_dir / f"nmt-worker-slot-{slot}.lock", "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _slot_lock = (slot, handle)
+        return slot
+    
+    logger.warning(f"All {num_slots} worker slots are taken, sharing slot 0")
+    return 0
+
+
+def cpus_for_worker(worker_index: int, workers: int, threads: int, mode: str) -> List[int]:
+    """Pick the CPUs a worker should be pinned to"""
+    if mode == "numa":
+        nodes = numa_nodes()
+        return nodes[worker_index % len(nodes)]
+    
+    cpus = available_cpus()
+    per_worker = threads or max(len(cpus) // max(workers, 1), 1)
+    start = (worker_index * per_worker) % len(cpus)
+    selected = cpus[start:start + per_worker]
+    # Wrap around when workers x threads exceeds the CPU count
+    if len(selected) < per_worker:
+        selected += cpus[:per_worker - len(selected)]
+    return selected
+
+
+def _pin_process(cpus: List[int]) -> None:
+    """Pin every existing thread of this process; new threads inherit the mask"""
+    task_dir = Path("/proc/self/task")
+    thread_ids = [int(tid.name) for tid in task_dir.iterdir()] if task_dir.is_dir() else [0]
+    for tid in thread_ids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            # Threads may exit while we iterate
+            continue
+
+
+def configure_cpu(
+    num_threads: Optional[int] = None,
+    interop_threads: Optional[int] = None,
+    affinity: Optional[str] = None,
+    workers: int = 1,
+    worker_index: Optional[int] = None
+) -> Dict[str, Any]:
+    """Apply torch thread counts and optional CPU pinning once per process"""
+    global _applied
+    if _applied is not None:
+        return _applied
+    
+    applied: Dict[str, Any] = {}
+    if affinity:
+        if affinity not in AFFINITY_MODES:
+            raise ValueError(f"Unsupported CPU affinity mode: {affinity}")
+        if hasattr(os, "sched_setaffinity"):
+            index = worker_index if worker_index is not None else claim_worker_slot(workers)
+            cpus = cpus_for_worker(index, workers, num_threads or 0, affinity)
+            _pin_process(cpus)
+            applied.update({"affinity": affinity, "worker_index": index, "cpus": cpus})
+            # Without an explicit thread count, use exactly the pinned cores
+            num_threads = num_threads or len(cpus)
+        else:
+            logger.warning("CPU affinity is not supported on this platform, skipping")
+    if not num_threads and workers > 1:
+        # Otherwise every worker sizes its pool to all cores and they oversubscribe
+        num_threads = max(len(available_cpus()) // workers, 1)
+    
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            # Only allowed before any inter-op parallel work has started
+            logger.warning(f"Could not set inter-op threads: {e}")
+    
+    applied.update({
+        "num_threads": torch.get_num_threads(),
+        "interop_threads": torch.get_num_interop_threads()
+    })
+    logger.info(f"CPU configuration: {applied}")
+    _applied = applied
+    return applied
@@ -0,0 +1,3 @@
+"""
+Load-balancing gateway package
+"""
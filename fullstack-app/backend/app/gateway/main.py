@@ -0,0 +1,181 @@
+"""
+Gateway application that fans translation requests out to local replicas
+
+Usage:
+    # Route to replicas that are already running
+    GATEWAY_REPLICAS='["http://127.0.0.1:8001","http://127.0.0.1:8002"]' python -m app.gateway.main
+    
+    # Start three replicas as local processes and route to them
+    python -m app.gateway.main --spawn 3 --base-port 8001
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.gateway.pool import NoReplicaAvailable, ReplicaPool, ReplicaTimeout
+
+logger = get_logger(__name__)
+
+
+def create_gateway(replica_urls: Optional[List[str]] = None) -> FastAPI:
+    """Create the gateway application"""
+    pool = ReplicaPool(
+        replica_urls if replica_urls is not None else settings.GATEWAY_REPLICAS,
+        max_retries=settings.GATEWAY_MAX_RETRIES,
+        sticky_slack=settings.GATEWAY_STICKY_SLACK,
+        request_timeout_s=settings.GATEWAY_REQUEST_TIMEOUT_S,
+        health_interval_s=settings.GATEWAY_HEALTH_INTERVAL_S
+    )
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Lifespan manager for the gateway"""
+        logger.info(f"Starting gateway for {len(pool.replicas)} replicas")
+        await pool.start()
+        yield
+        await pool.close()
+    
+    app = FastAPI(
+        title=f"{settings.PROJECT_NAME} Gateway",
+        version=settings.VERSION,
+        lifespan=lifespan
+    )
+    app.state.pool = pool
+    
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    async def proxy(
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None
+    ) -> JSONResponse:
+        """Forward to a replica, dropping the upstream request if the client disconnects"""
+        task = asyncio.create_task(pool.forward(method, path, payload))
+        try:
+            while request is not None and not task.done():
+                done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_INTERVAL_S)
+                if not done and await request.is_disconnected():
+                    # Closing the upstream connection lets the replica cancel its generation
+                    logger.info("Client disconnected, cancelling the upstream request")
+                    task.cancel()
+                    raise HTTPException(status_code=499, detail="Client closed request")
+            status_code, body, replica = await task
+        except ReplicaTimeout as e:
+            logger.error(f"Gateway error: {e}")
+            raise HTTPException(status_code=504, detail=str(e))
+        except NoReplicaAvailable as e:
+            logger.error(f"Gateway error: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=status_code, content=body, headers={"X-Replica": replica})
+    
+    @app.post("/api/v1/translate")
+    async def translate(request: Request):
+        """Forward a single translation"""
+        return await proxy("POST", "/api/v1/translate", await request.json(), request)
+    
+    @app.post("/api/v1/translate/batch")
+    async def translate_batch(request: Request):
+        """Forward a batch translation"""
+        return await proxy("POST", "/api/v1/translate/batch", await request.json(), request)
+    
+    @app.get("/api/v1/languages")
+    async def languages():
+        """Forward the supported languages lookup"""
+        return await proxy("GET", "/api/v1/languages")
+    
+    @app.get("/api/v1/model/info")
+    async def model_info():
+        """Forward the model information lookup"""
+        return await proxy("GET", "/api/v1/model/info")
+    
+    @app.get("/health")
+    async def health():
+        """Healthy while at least one replica can serve"""
+        available = sum(1 for replica in pool.replicas if replica.available)
+        return JSONResponse(
+            status_code=200 if available else 503,
+            content={"status": "healthy" if available else "unavailable", "available_replicas": available}
+        )
+    
+    @app.get("/gateway/replicas")
+    async def replicas():
+        """Per-replica health and load"""
+        return {"replicas": pool.status()}
+    
+    @app.exception_handler(HTTPException)
+    async def http_exception_handler(request, exc):
+        """Handle HTTP exceptions"""
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={
+                "error": "HTTP Error",
+                "message": exc.detail
+            }
+        )
+    
+    return app
+
+
+def spawn_replicas(count: int, base_port: int, host: str = "127.0.0.1") -> List[subprocess.Popen]:
+    """Start count API replicas as local processes on consecutive ports"""
+    processes = []
+    for index in range(count):
+        # Lets CPU_AFFINITY give every replica its own share of the cores
+        env = dict(os.environ, WORKER_INDEX=str(index), WORKERS=str(count))
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", host, "--port", str(base_port + index), "--log-level", "warning"
+            ],
+            env=env
+        ))
+        logger.info(f"Started replica {index} on port {base_port + index}")
+    return processes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Run the translation gateway")
+    parser.add_argument("--spawn", type=int, default=0, help="Start this many local replicas")
+    parser.add_argument("--base-port", type=int, default=8001, help="Port of the first spawned replica")
+    parser.add_argument("--replica", action="append", default=None, help="Replica base URL (repeatable)")
+    parser.add_argument("--host", default=settings.GATEWAY_HOST)
+    parser.add_argument("--port", type=int, default=settings.GATEWAY_PORT)
+    args = parser.parse_args(argv)
+    
+    urls = list(args.replica or settings.GATEWAY_REPLICAS)
+    processes = spawn_replicas(args.spawn, args.base_port) if args.spawn else []
+    urls += [f"http://127.0.0.1:{args.base_port + index}" for index in range(args.spawn)]
+    if not urls:
+        parser.error("No replicas configured: use --replica, --spawn or GATEWAY_REPLICAS")
+    
+    try:
+        uvicorn.run(create_gateway(urls), host=args.host, port=args.port, log_level="info")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
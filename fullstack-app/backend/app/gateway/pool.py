@@ -0,0 +1,231 @@
+"""
+Replica pool with least-outstanding-work routing
+"""
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Replica responses that mean "try somewhere else". A 504 means the request's
+# own deadline passed and a 500 is a translation error that would repeat, so
+# another replica would only redo work
+RETRYABLE_STATUS = {502, 503}
+
+# Errors raised before the replica received the request
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class NoReplicaAvailable(RuntimeError):
+    """Raised when no healthy and ready replica can take a request"""
+
+
+class ReplicaTimeout(RuntimeError):
+    """Raised when a replica took longer than the gateway's request timeout"""
+
+
+def estimate_cost(payload: Dict[str, Any]) -> float:
+    """Rough relative cost of a translation request
+    
+    Decode work grows with the number of input tokens (about four characters
+    each) and the beam width.
+    """
+    texts = payload.get("texts") or [payload.get("text") or ""]
+    num_beams = payload.get("num_beams") or 4
+    tokens = sum(len(text) / 4 + 1 for text in texts)
+    return tokens * num_beams
+
+
+def routing_key(payload: Dict[str, Any]) -> str:
+    """Key that is identical for identical translation inputs"""
+    fields = {
+        key: payload.get(key)
+        for key in ("text", "texts", "source_language", "target_language", "num_beams", "max_length")
+    }
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class Replica:
+    """A translation backend and the work currently routed to it"""
+    
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = False
+        self.ready = False
+        self.outstanding_cost = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+    
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.ready
+    
+    def mark_failed(self, error: str) -> None:
+        """Take the replica out of rotation until the next successful health check"""
+        self.healthy = False
+        self.failures += 1
+        self.last_error = error
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "ready": self.ready,
+            "outstanding_cost": round(self.outstanding_cost, 1),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_check": self.last_check
+        }
+
+
+class ReplicaPool:
+    """Routes requests across replicas and keeps their health up to date"""
+    
+    def __init__(
+        self,
+        urls: List[str],
+        max_retries: int = 2,
+        sticky_slack: float = 2.0,
+        request_timeout_s: float = 120.0,
+        health_interval_s: float = 2.0
+    ):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_retries = max_retries
+        self.sticky_slack = sticky_slack
+        self.health_interval_s = health_interval_s
+        self.client = httpx.AsyncClient(timeout=request_timeout_s)
+        self._health_task: Optional[asyncio.Task] = None
+    
+    def choose(self, key: str, cost: float, exclude: Set[str]) -> Replica:
+        """Pick a replica for a request
+        
+        Identical inputs map to the same replica by rendezvous hashing so its
+        caches stay warm, unless that replica already carries more than
+        sticky_slack request costs of extra work over the least loaded one.
+        """
+        candidates = [r for r in self.replicas if r.available and r.url not in exclude]
+        if not candidates:
+            raise NoReplicaAvailable("No healthy translation replica available")
+        
+        least_loaded = min(candidates, key=lambda r: (r.outstanding_cost, r.in_flight))
+        sticky = max(
+            candidates,
+            key=lambda r: hashlib.sha1(f"{key}|{r.url}".encode("utf-8")).hexdigest()
+        )
+        if sticky.outstanding_cost - least_loaded.outstanding_cost <= self.sticky_slack * cost:
+            return sticky
+        return least_loaded
+    
+    @contextmanager
+    def track(self, replica: Replica, cost: float) -> Iterator[None]:
+        """Account for a request's cost while it is in flight on a replica"""
+        replica.outstanding_cost += cost
+        replica.in_flight += 1
+        replica.requests += 1
+        try:
+            yield
+        finally:
+            replica.outstanding_cost -= cost
+            replica.in_flight -= 1
+    
+    async def forward(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Any, str]:
+        """Send a request to the best replica, retrying on other replicas on failure
+        
+        Returns the status code, decoded JSON body and the replica that answered.
+        """
+        payload = payload or {}
+        cost = estimate_cost(payload) if method == "POST" else 1.0
+        key = routing_key(payload)
+        tried: Set[str] = set()
+        last_error = "no attempt made"
+        
+        for _ in range(self.max_retries + 1):
+            try:
+                replica = self.choose(key, cost, tried)
+            except NoReplicaAvailable:
+                break
+            tried.add(replica.url)
+            
+            with self.track(replica, cost):
+                try:
+                    response = await self.client.request(
+                        method,
+                        f"{replica.url}{path}",
+                        json=payload if method == "POST" else None
+                    )
+                except CONNECT_ERRORS as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                    logger.warning(f"Replica {replica.url} failed: {last_error}")
+                    replica.mark_failed(last_error)
+                    continue
+                except httpx.TimeoutException as e:
+                    # A busy replica is still healthy, and a retry would start the same long request again
+                    replica.last_error = f"{type(e).__name__}: {e}"
+                    raise ReplicaTimeout(f"Replica {replica.url} did not answer in time")
+                except httpx.HTTPError as e:
+                    # The replica may have run the request already, so it is not sent again
+                    last_error = f"{type(e).__name__}: {e}"
+                    logger.warning(f"Replica {replica.url} failed: {last_error}")
+                    replica.mark_failed(last_error)
+                    break
+            
+            if response.status_code in RETRYABLE_STATUS:
+                last_error = f"HTTP {response.status_code} from {replica.url}"
+                logger.warning(f"Retrying after {last_error}")
+                replica.failures += 1
+                replica.last_error = last_error
+                continue
+            return response.status_code, response.json(), replica.url
+        
+        raise NoReplicaAvailable(f"Request failed on {len(tried)} replica(s): {last_error}")
+    
+    async def check(self, replica: Replica) -> None:
+        """Probe a replica's health endpoint"""
+        try:
+            response = await self.client.get(f"{replica.url}/api/v1/health", timeout=5.0)
+            body = response.json()
+            replica.healthy = response.status_code == 200
+            replica.ready = bool(body.get("model_loaded"))
+        except (httpx.HTTPError, ValueError) as e:
+            replica.healthy = False
+            replica.ready = False
+            replica.last_error = f"health check: {e}"
+        replica.last_check = time.time()
+    
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+    
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.health_interval_s)
+    
+    async def start(self) -> None:
+        """Run an initial health check and keep checking in the background"""
+        await self.check_all()
+        self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+        await self.client.aclose()
+    
+    def status(self) -> List[Dict[str, Any]]:
+        return [replica.status() for replica in self.replicas]
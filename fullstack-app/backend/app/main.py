@@ -8,9 +8,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
+from app.core.capture import CaptureMiddleware, TrafficCapture
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.api.translation import router as translation_router
+from app.api.admin import router as admin_router
 from app.services.translation import translation_service
 
 logger = get_logger(__name__)
@@ -56,12 +58,24 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Record request shapes and timing for replay
+    if settings.CAPTURE_FILE:
+        app.add_middleware(
+            CaptureMiddleware,
+            capture=TrafficCapture(settings.CAPTURE_FILE, redact=settings.CAPTURE_REDACT)
+        )
+    
     # Include routers
     app.include_router(
         translation_router,
         prefix="/api/v1",
         tags=["translation"]
     )
+    app.include_router(
+        admin_router,
+        prefix="/api/v1/admin",
+        tags=["admin"]
+    )
     
     # Root endpoint
     @app.get("/")
@@ -126,10 +140,12 @@ app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
+    from app.core.cpu import tuned_cpu_settings
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else tuned_cpu_settings()["workers"],
         log_level="info"
     )
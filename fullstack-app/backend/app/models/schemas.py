@@ -10,6 +10,9 @@ SOURCE_LANG_DESC = "Source language code"
 TARGET_LANG_DESC = "Target language code"
 NUM_BEAMS_DESC = "Number of beams for beam search"
 MAX_LENGTH_DESC = "Maximum output length"
+TIMEOUT_DESC = "Give up on the request after this many milliseconds"
+RETURN_SEQUENCES_DESC = "Number of best hypotheses to return, at most num_beams"
+RETURN_SCORES_DESC = "Return sequence and confidence scores from the beam search"
 
 
 class TranslationRequest(BaseModel):
@@ -19,6 +22,17 @@ class TranslationRequest(BaseModel):
     target_language: str = Field(default="ta", description=TARGET_LANG_DESC)
     num_beams: Optional[int] = Field(default=4, ge=1, le=10, description=NUM_BEAMS_DESC)
     max_length: Optional[int] = Field(default=512, ge=10, le=1024, description=MAX_LENGTH_DESC)
+    timeout_ms: Optional[int] = Field(default=None, ge=1, description=TIMEOUT_DESC)
+    num_return_sequences: int = Field(default=1, ge=1, le=10, description=RETURN_SEQUENCES_DESC)
+    return_scores: bool = Field(default=False, description=RETURN_SCORES_DESC)
+    
+    @validator('num_return_sequences')
+    def validate_return_sequences(cls, v, values):
+        # A null num_beams is resolved to the server default and checked there
+        num_beams = values.get('num_beams')
+        if num_beams is not None and v > num_beams:
+            raise ValueError('num_return_sequences cannot exceed num_beams')
+        return v
     
     @validator('text')
     def validate_text(cls, v):
@@ -27,6 +41,13 @@ class TranslationRequest(BaseModel):
         return v.strip()
 
 
+class TranslationHypothesis(BaseModel):
+    """One hypothesis of an n-best list"""
+    text: str = Field(..., description="Translated text")
+    score: float = Field(..., description="Length-normalized log-probability")
+    confidence: float = Field(..., description="exp(score), between 0 and 1")
+
+
 class TranslationResponse(BaseModel):
     """Response model for translation"""
     original_text: str = Field(..., description="Original input text")
@@ -35,6 +56,8 @@ class TranslationResponse(BaseModel):
     target_language: str = Field(..., description=TARGET_LANG_DESC)
     num_beams: int = Field(..., description=NUM_BEAMS_DESC)
     confidence_score: Optional[float] = Field(None, description="Translation confidence score")
+    sequence_score: Optional[float] = Field(None, description="Length-normalized log-probability of the translation")
+    alternatives: Optional[List[TranslationHypothesis]] = Field(None, description="n best hypotheses, best first")
     processing_time_ms: float = Field(..., description="Processing time in milliseconds")
     model_info: Dict[str, Any] = Field(..., description="Model information")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Translation timestamp")
@@ -47,6 +70,17 @@ class BatchTranslationRequest(BaseModel):
     target_language: str = Field(default="ta", description=TARGET_LANG_DESC)
     num_beams: Optional[int] = Field(default=4, ge=1, le=10, description=NUM_BEAMS_DESC)
     max_length: Optional[int] = Field(default=512, ge=10, le=1024, description=MAX_LENGTH_DESC)
+    timeout_ms: Optional[int] = Field(default=None, ge=1, description=TIMEOUT_DESC)
+    num_return_sequences: int = Field(default=1, ge=1, le=10, description=RETURN_SEQUENCES_DESC)
+    return_scores: bool = Field(default=False, description=RETURN_SCORES_DESC)
+    
+    @validator('num_return_sequences')
+    def validate_return_sequences(cls, v, values):
+        # A null num_beams is resolved to the server default and checked there
+        num_beams = values.get('num_beams')
+        if num_beams is not None and v > num_beams:
+            raise ValueError('num_return_sequences cannot exceed num_beams')
+        return v
 
 
 class BatchTranslationResponse(BaseModel):
@@ -61,6 +95,7 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="API version")
     model_loaded: bool = Field(..., description="Whether model is loaded")
     model_info: Optional[Dict[str, Any]] = Field(None, description="Model information")
+    memory: Optional[Dict[str, Any]] = Field(None, description="Memory budget and current reservations")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Check timestamp")
 
 
@@ -83,3 +118,39 @@ class SupportedLanguagesResponse(BaseModel):
     """Supported languages response"""
     languages: List[LanguageInfo] = Field(..., description="List of supported languages")
     total_count: int = Field(..., description="Total number of supported languages")
+
+
+class ModelReloadRequest(BaseModel):
+    """Request model for a hot model reload"""
+    model_path: Optional[str] = Field(None, description="Model directory to load, defaults to the current one")
+
+
+class ModelReloadResponse(BaseModel):
+    """Response model for a hot model reload"""
+    previous_revision: Optional[str] = Field(None, description="Revision that was serving before the reload")
+    revision: str = Field(..., description="Revision now serving")
+    model_path: str = Field(..., description="Directory the new revision was loaded from")
+    load_time_ms: float = Field(..., description="Time to load and warm up the new revision")
+    drained: bool = Field(..., description="Whether in-flight requests on the old revision finished in time")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Reload timestamp")
+
+
+class ProfileRequest(BaseModel):
+    """Request model for an on-demand profiling session"""
+    duration_s: float = Field(default=10.0, gt=0, description="Longest time to profile for")
+    max_requests: Optional[int] = Field(None, ge=1, description="Stop after this many translation requests")
+    sample_interval_ms: float = Field(default=5.0, ge=1, le=1000, description="Python stack sampling interval")
+    top: int = Field(default=20, ge=1, le=200, description="Number of operators and functions to report")
+
+
+class ProfileResponse(BaseModel):
+    """Response model for a finished profiling session"""
+    session_id: str = Field(..., description="Session identifier, used to download the trace")
+    duration_s: float = Field(..., description="Time the session ran for")
+    requests: int = Field(..., description="Translation requests completed during the session")
+    trace_path: str = Field(..., description="Chrome trace written by the torch profiler")
+    folded_stacks_path: str = Field(..., description="Sampled Python stacks in folded flame graph format")
+    stages: Dict[str, Any] = Field(..., description="Calls and wall time of tokenize, generate and decode")
+    top_operators: List[Dict[str, Any]] = Field(..., description="Torch operators with the most self time")
+    top_python: List[Dict[str, Any]] = Field(..., description="Python functions seen most often in samples")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Session end timestamp")
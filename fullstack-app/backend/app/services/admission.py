@@ -0,0 +1,190 @@
+"""
+Memory-bounded admission control for generation
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import torch
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+MB = 1024 * 1024
+
+# Headroom for allocator fragmentation and temporaries the estimate ignores
+SAFETY_FACTOR = 1.25
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request cannot be admitted within the memory budget"""
+    
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def is_out_of_memory(error: BaseException) -> bool:
+    """Whether an exception is an allocation failure from torch or Python"""
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and (
+        "out of memory" in message or "can't allocate memory" in message
+    )
+
+
+def detect_memory_budget(device: torch.device, fraction: float = 0.7) -> int:
+    """Default budget: a fraction of the memory currently free on the device"""
+    if device.type == "cuda":
+        free, _ = torch.cuda.mem_get_info(device)
+        return int(free * fraction)
+    
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(int(line.split()[1]) * 1024 * fraction)
+    except OSError:
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") * fraction)
+    except (ValueError, OSError, AttributeError):
+        # Unknown platform, fall back to a conservative 2GB
+        return 2048 * MB
+
+
+def estimate_generation_bytes(
+    config: Any,
+    batch_size: int,
+    input_length: int,
+    num_beams: int,
+    max_length: int,
+    dtype_bytes: int = 4,
+    output_scores: bool = False
+) -> int:
+    """Estimate peak activation memory of one encoder-decoder generate call
+    
+    Covers the encoder activations of a single layer, encoder outputs expanded
+    per beam, the cross-attention and self-attention key/value caches and the
+    per-step logits over the vocabulary. With output_scores the logits of
+    every step are kept for scoring until generate returns.
+    """
+    d_model = config.d_model
+    d_ff = getattr(config, "d_ff", 4 * d_model)
+    heads = config.num_heads
+    inner_dim = heads * getattr(config, "d_kv", d_model // heads)
+    decoder_layers = getattr(config, "num_decoder_layers", None) or config.num_layers
+    rows = batch_size * num_beams
+    
+    encoder = batch_size * input_length * (3 * d_model + d_ff + heads * input_length)
+    encoder_outputs = rows * input_length * d_model
+    cross_cache = decoder_layers * 2 * rows * input_length * inner_dim
+    self_cache = decoder_layers * 2 * rows * max_length * inner_dim
+    decoder_step = rows * (3 * d_model + d_ff + heads * (max_length + input_length))
+    logits = 3 * rows * config.vocab_size
+    if output_scores:
+        logits += rows * config.vocab_size * max_length
+    
+    elements = encoder + encoder_outputs + cross_cache + self_cache + decoder_step + logits
+    # Token ids and beam bookkeeping are int64
+    sequences = rows * max_length * 8
+    return int((elements * dtype_bytes + sequences) * SAFETY_FACTOR)
+
+
+class MemoryBudget:
+    """Tracks memory reserved by in-flight generate calls against a budget"""
+    
+    def __init__(self, budget_bytes: Optional[int] = None, timeout_s: float = 30.0):
+        self.budget_bytes = budget_bytes
+        self.timeout_s = timeout_s
+        self._reserved = 0
+        self._active = 0
+        self._waiting = 0
+        self._peak = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._oom_splits = 0
+        self._condition = threading.Condition()
+    
+    def set_budget(self, budget_bytes: int) -> None:
+        """Set the budget, waking any waiters if it grew"""
+        with self._condition:
+            self.budget_bytes = budget_bytes
+            self._condition.notify_all()
+    
+    def fits(self, nbytes: int) -> bool:
+        """Whether a reservation of nbytes could ever be admitted"""
+        return self.budget_bytes is None or nbytes <= self.budget_bytes
+    
+    @contextmanager
+    def reserve(
+        self,
+        nbytes: int,
+        cancelled: Optional[Callable[[], bool]] = None,
+        poll_interval_s: float = 0.1
+    ) -> Iterator[None]:
+        """Hold nbytes of the budget for the duration of the block
+        
+        While waiting for room, cancelled is checked every poll_interval_s and
+        the wait ends with a "cancelled" rejection once it returns True.
+        """
+        with self._condition:
+            if not self.fits(nbytes):
+                self._rejected += 1
+                raise AdmissionRejected(
+                    f"Request needs ~{nbytes / MB:.0f}MB, more than the {self.budget_bytes / MB:.0f}MB budget",
+                    reason="too_large"
+                )
+            
+            deadline = time.monotonic() + self.timeout_s
+            self._waiting += 1
+            try:
+                while self.budget_bytes is not None and self._reserved + nbytes > self.budget_bytes:
+                    if cancelled is not None and cancelled():
+                        self._cancelled += 1
+                        raise AdmissionRejected("Request cancelled while waiting for memory", reason="cancelled")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        raise AdmissionRejected(
+                            f"Timed out after {self.timeout_s:.0f}s waiting for {nbytes / MB:.0f}MB of memory",
+                            reason="timeout"
+                        )
+                    self._condition.wait(min(remaining, poll_interval_s) if cancelled else remaining)
+            finally:
+                self._waiting -= 1
+            
+            self._reserved += nbytes
+            self._active += 1
+            self._peak = max(self._peak, self._reserved)
+        
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._reserved -= nbytes
+                self._active -= 1
+                self._condition.notify_all()
+    
+    def record_split(self) -> None:
+        """Count a batch that was split after an allocation failure"""
+        with self._condition:
+            self._oom_splits += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current reservations, for the health endpoint"""
+        with self._condition:
+            return {
+                "budget_mb": round(self.budget_bytes / MB, 1) if self.budget_bytes is not None else None,
+                "reserved_mb": round(self._reserved / MB, 1),
+                "peak_reserved_mb": round(self._peak / MB, 1),
+                "active_reservations": self._active,
+                "waiting": self._waiting,
+                "rejected": self._rejected,
+                "cancelled_while_waiting": self._cancelled,
+                "oom_splits": self._oom_splits
+            }
@@ -0,0 +1,127 @@
+"""
+Cancellation of generation for clients that disconnected or ran out of time
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import torch
+from packaging import version
+from transformers import StoppingCriteria, __version__ as transformers_version
+
+# Older releases only accept a single bool from a stopping criterion
+PER_ROW_STOPPING = version.parse(transformers_version) >= version.parse("4.39.0")
+
+
+class RequestCancelled(RuntimeError):
+    """Raised for a request whose client disconnected or whose deadline passed"""
+    
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled: {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """Cancellation state of one request, shared with the thread generating for it"""
+    
+    def __init__(self, timeout_s: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout_s if timeout_s else None
+        self.reason: Optional[str] = None
+    
+    def cancel(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+    
+    def is_cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self.reason is not None
+    
+    def error(self) -> RequestCancelled:
+        return RequestCancelled(self.reason or "cancelled")
+
+
+class CancellationCriteria(StoppingCriteria):
+    """Stopping criterion checked after every decode step
+    
+    Rows of cancelled items are marked finished, which stops greedy search
+    from appending tokens to them. The forward pass still runs over every
+    row, and beam search only ends when all rows are done, so compute is
+    saved only once every item in the call is cancelled and generation stops.
+    Rows past the last item (bucket padding) stop with the last live item.
+    """
+    
+    def __init__(self, tokens: List[CancellationToken], num_beams: int):
+        self.tokens = tokens
+        self.num_beams = num_beams
+        # Item index -> sequence length when its cancellation was seen
+        self.cancelled_at: Dict[int, int] = {}
+        self.stopped_at: Optional[int] = None
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs: Any) -> Any:
+        step = input_ids.shape[-1]
+        for index, token in enumerate(self.tokens):
+            if index not in self.cancelled_at and token.is_cancelled():
+                self.cancelled_at[index] = step
+        all_cancelled = len(self.cancelled_at) == len(self.tokens)
+        if all_cancelled and self.stopped_at is None:
+            self.stopped_at = step
+        
+        if not PER_ROW_STOPPING:
+            return all_cancelled
+        done = torch.full((input_ids.shape[0],), all_cancelled, dtype=torch.bool, device=input_ids.device)
+        for index in self.cancelled_at:
+            done[index * self.num_beams:(index + 1) * self.num_beams] = True
+        return done
+
+
+class CancellationStats:
+    """Counts of cancelled requests and the decode work they ran or skipped"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cancelled: Dict[str, int] = {}
+        self.skipped_before_generate = 0
+        self.stopped_during_generate = 0
+        self.decode_steps_run = 0
+        self.decode_steps_after_cancel = 0
+        self.decode_steps_saved = 0
+    
+    def record_skipped(self, tokens: List[CancellationToken]) -> None:
+        """Items dropped from a batch before it reached the model"""
+        with self._lock:
+            for token in tokens:
+                self.cancelled[token.reason] = self.cancelled.get(token.reason, 0) + 1
+            self.skipped_before_generate += len(tokens)
+    
+    def record_generation(self, criteria: CancellationCriteria, max_length: int, final_length: int) -> None:
+        """Items cancelled while their batch was decoding
+        
+        Steps are counted per beam row. A cancelled item's rows stay in the
+        batch until the call ends at final_length, so they run every step of
+        it. Saved steps assume the stopped call would otherwise have run to
+        max_length, so they are an upper bound.
+        """
+        if not criteria.cancelled_at:
+            return
+        rows = len(criteria.tokens) * criteria.num_beams
+        with self._lock:
+            for index, step in criteria.cancelled_at.items():
+                reason = criteria.tokens[index].reason
+                self.cancelled[reason] = self.cancelled.get(reason, 0) + 1
+                self.decode_steps_run += final_length * criteria.num_beams
+                self.decode_steps_after_cancel += max(final_length - step, 0) * criteria.num_beams
+            self.stopped_during_generate += len(criteria.cancelled_at)
+            if criteria.stopped_at is not None:
+                self.decode_steps_saved += max(max_length - criteria.stopped_at, 0) * rows
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cancelled": dict(self.cancelled),
+                "skipped_before_generate": self.skipped_before_generate,
+                "stopped_during_generate": self.stopped_during_generate,
+                "decode_steps_run": self.decode_steps_run,
+                "decode_steps_after_cancel": self.decode_steps_after_cancel,
+                "decode_steps_saved": self.decode_steps_saved
+            }
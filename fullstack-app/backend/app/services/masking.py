@@ -0,0 +1,173 @@
+"""
+Placeholder masking for spans that must not be translated
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Pattern, Tuple
+
+# T5 sentinel tokens are single vocabulary entries, so each masked span costs one token
+PLACEHOLDER_PATTERN = re.compile(r"<extra_id_(\d+)>")
+MAX_PLACEHOLDERS = 100
+
+# Checked in order; a later pattern never splits a span an earlier one matched
+SPAN_PATTERNS: List[Tuple[str, Pattern]] = [
+    ("code", re.compile(r"```.*?```|`[^`\n]+`", re.DOTALL)),
+    ("url", re.compile(r"\b(?:https?://|www\.)[^\s<>\"'`]*[^\s<>\"'`.,;:!?)\]]")),
+    ("email", re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")),
+    # Not after a letter and a hyphen, so names like COVID-19 are translated whole
+    ("number", re.compile(r"(?<!\w)(?<![^\W\d_]-)[+-]?\d+(?:[.,:/-]\d+)*%?(?!\w)")),
+]
+
+# Runs of text already written in the target language's script
+TARGET_SCRIPT_PATTERNS: Dict[str, Pattern] = {
+    "ta": re.compile(r"[\u0B80-\u0BFF]+(?:[\s\u0B80-\u0BFF]*[\u0B80-\u0BFF])?"),
+    "en": re.compile(r"[A-Za-z]+(?:[\sA-Za-z'-]*[A-Za-z])?"),
+}
+
+# Any letter; text without one left after masking has nothing to translate
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+
+def placeholder(index: int) -> str:
+    return f"<extra_id_{index}>"
+
+
+@dataclass
+class MaskedText:
+    """Text with untranslatable spans replaced by placeholders"""
+    text: str
+    spans: List[str] = field(default_factory=list)
+    kinds: List[str] = field(default_factory=list)
+    passthrough: bool = False
+
+
+def find_spans(text: str, target_lang: str) -> List[Tuple[int, int, str]]:
+    """Non-overlapping (start, end, kind) spans that should be kept verbatim"""
+    patterns = list(SPAN_PATTERNS)
+    if target_lang in TARGET_SCRIPT_PATTERNS:
+        patterns.append(("target_script", TARGET_SCRIPT_PATTERNS[target_lang]))
+    
+    spans: List[Tuple[int, int, str]] = []
+    for kind, pattern in patterns:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if not any(start < s_end and s_start < end for s_start, s_end, _ in spans):
+                spans.append((start, end, kind))
+    return sorted(spans)[:MAX_PLACEHOLDERS]
+
+
+def mask_text(text: str, target_lang: str) -> MaskedText:
+    """Replace untranslatable spans with placeholders
+    
+    Text that has no letters left once its spans are removed (numbers, URLs,
+    text already in the target script) is marked passthrough and returned as is.
+    """
+    spans = find_spans(text, target_lang)
+    if not spans:
+        return MaskedText(text=text)
+    
+    pieces = []
+    remaining = []
+    position = 0
+    for index, (start, end, _) in enumerate(spans):
+        pieces.append(text[position:start])
+        remaining.append(text[position:start])
+        pieces.append(placeholder(index))
+        position = end
+    pieces.append(text[position:])
+    remaining.append(text[position:])
+    
+    return MaskedText(
+        text="".join(pieces),
+        spans=[text[start:end] for start, end, _ in spans],
+        kinds=[kind for _, _, kind in spans],
+        passthrough=not LETTER_PATTERN.search("".join(remaining))
+    )
+
+
+def restore(translation: str, masked: MaskedText) -> str:
+    """Put the original spans back in place of their placeholders
+    
+    Spans whose placeholder the model dropped are appended so no content is
+    lost; placeholders the model invented are removed.
+    """
+    # Text between the placeholders the model kept; invented ones are dropped
+    pieces = PLACEHOLDER_PATTERN.split(translation)
+    texts = [pieces[0]]
+    indices: List[int] = []
+    for index, text in zip(pieces[1::2], pieces[2::2]):
+        if int(index) < len(masked.spans):
+            indices.append(int(index))
+            texts.append(text)
+        else:
+            texts[-1] += text
+    
+    # Spacing is normalized in the model output only, never inside the spans
+    texts = [re.sub(r"[ \t]{2,}", " ", text) for text in texts]
+    texts[0] = texts[0].lstrip()
+    texts[-1] = texts[-1].rstrip()
+    restored = texts[0] + "".join(masked.spans[index] + text for index, text in zip(indices, texts[1:]))
+    
+    missing = [span for index, span in enumerate(masked.spans) if index not in indices]
+    if missing:
+        restored = " ".join(([restored] if restored else []) + missing)
+    return restored
+
+
+def supports_placeholders(tokenizer: Any) -> bool:
+    """Whether the tokenizer has the sentinel tokens used as placeholders"""
+    return tokenizer.convert_tokens_to_ids(placeholder(0)) != tokenizer.unk_token_id
+
+
+def decode_keeping_placeholders(tokenizer: Any, sequences: Any) -> List[str]:
+    """batch_decode with skip_special_tokens, except for placeholder tokens"""
+    keep = set(tokenizer.convert_tokens_to_ids([placeholder(i) for i in range(MAX_PLACEHOLDERS)]))
+    # Missing sentinels map to <unk>, which must still be dropped
+    keep.discard(tokenizer.unk_token_id)
+    drop = set(tokenizer.all_special_ids) - keep
+    return [
+        tokenizer.decode([token for token in sequence.tolist() if token not in drop])
+        for sequence in sequences
+    ]
+
+
+def tokens_saved(tokenizer: Any, text: str, masked: MaskedText) -> int:
+    """Input tokens the model does not see thanks to masking
+    
+    Tokenizes the text twice, so it is only used for offline reports.
+    """
+    if not masked.spans:
+        return 0
+    original = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+    if masked.passthrough:
+        return original
+    return max(original - len(tokenizer(masked.text, add_special_tokens=False)["input_ids"]), 0)
+
+
+class MaskingStats:
+    """Running totals of masked spans and passthrough requests"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.masked_requests = 0
+        self.passthrough = 0
+        self.spans: Dict[str, int] = {}
+    
+    def record(self, masked: MaskedText) -> None:
+        with self._lock:
+            self.requests += 1
+            self.masked_requests += bool(masked.spans)
+            self.passthrough += masked.passthrough
+            for kind in masked.kinds:
+                self.spans[kind] = self.spans.get(kind, 0) + 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "masked_requests": self.masked_requests,
+                "passthrough": self.passthrough,
+                "spans": dict(self.spans)
+            }
@@ -0,0 +1,253 @@
+"""
+On-demand profiling of the translation hot path
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import torch
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Returned by Profiler.stage while no session runs, so the hot path pays one attribute check
+_INACTIVE = nullcontext()
+
+MAX_STACK_DEPTH = 40
+
+
+class ProfilingBusy(RuntimeError):
+    """Raised when a profiling session is requested while another one is running"""
+
+
+def _folded_stack(frame: Any) -> str:
+    """Outermost-first 'function (file:line)' frames joined by ';'"""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class _Session:
+    """Stage timings, torch profiles and Python stack samples of one profiling window
+    
+    The torch profiler only records the thread that starts it, so each stage
+    opens its own profiler on the request thread running it. One stage is
+    profiled at a time; stages on other threads meanwhile only contribute
+    timings and stack samples.
+    """
+    
+    def __init__(self, max_requests: Optional[int], sample_interval_s: float, activities: List[Any]):
+        self.max_requests = max_requests
+        self.sample_interval_s = sample_interval_s
+        self.activities = activities
+        self.requests = 0
+        self.done = threading.Event()
+        self.closed = False
+        self.stage_times: Dict[str, List[float]] = {}
+        self.samples: Counter = Counter()
+        self.profiles: List[Any] = []
+        self.unprofiled_stages = 0
+        # Thread id -> stage that thread is currently in
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._profiler_lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        previous = self._threads.get(thread_id)
+        self._threads[thread_id] = name
+        profiled = previous is None and self._profiler_lock.acquire(blocking=False)
+        profile = None
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                if profiled:
+                    stack.callback(self._profiler_lock.release)
+                    try:
+                        profile = stack.enter_context(
+                            torch.profiler.profile(activities=self.activities, record_shapes=True)
+                        )
+                    except RuntimeError as e:
+                        # Never fail a translation because the profiler could not start
+                        logger.warning(f"Could not profile stage {name}: {e}")
+                stack.enter_context(torch.profiler.record_function(f"translation.{name}"))
+                yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if previous is None:
+                self._threads.pop(thread_id, None)
+            else:
+                self._threads[thread_id] = previous
+            with self._lock:
+                if not self.closed:
+                    self.stage_times.setdefault(name, []).append(elapsed_ms)
+                    if profile is not None:
+                        self.profiles.append(profile)
+                    elif previous is None:
+                        self.unprofiled_stages += 1
+    
+    def close(self) -> None:
+        """Stop accepting results from stages that finish after the window"""
+        with self._lock:
+            self.closed = True
+        self.done.set()
+    
+    def request_done(self) -> None:
+        with self._lock:
+            self.requests += 1
+            if self.max_requests and self.requests >= self.max_requests:
+                self.done.set()
+    
+    def sample_loop(self) -> None:
+        """Sample the Python stacks of threads inside a stage until the session ends"""
+        own_id = threading.get_ident()
+        while not self.done.wait(self.sample_interval_s):
+            frames = sys._current_frames()
+            for thread_id, stage in list(self._threads.items()):
+                frame = frames.get(thread_id)
+                if frame is not None and thread_id != own_id:
+                    self.samples[f"{stage};{_folded_stack(frame)}"] += 1
+
+
+class Profiler:
+    """Runs one bounded torch profiler and Python sampling session at a time"""
+    
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self._session: Optional[_Session] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+    
+    def stage(self, name: str) -> Any:
+        """Context manager around a hot-path stage; a no-op while inactive"""
+        session = self._session
+        return _INACTIVE if session is None else session.stage(name)
+    
+    def request_done(self) -> None:
+        session = self._session
+        if session is not None:
+            session.request_done()
+    
+    def run(
+        self,
+        duration_s: float,
+        max_requests: Optional[int] = None,
+        sample_interval_s: float = 0.005,
+        top: int = 20
+    ) -> Dict[str, Any]:
+        """Profile live traffic for duration_s or max_requests requests, whichever ends first
+        
+        Writes a Chrome trace, folded Python stacks and a JSON summary to
+        output_dir and returns the summary.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilingBusy("A profiling session is already running")
+        
+        try:
+            session_id = time.strftime("%Y%m%d-%H%M%S")
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            session = _Session(max_requests, sample_interval_s, activities)
+            
+            logger.info(f"Profiling session {session_id} started for up to {duration_s}s")
+            start = time.perf_counter()
+            self._session = session
+            sampler = threading.Thread(target=session.sample_loop, daemon=True)
+            sampler.start()
+            session.done.wait(duration_s)
+            self._session = None
+            session.close()
+            sampler.join()
+            elapsed = time.perf_counter() - start
+            
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            trace_path = self.output_dir / f"profile-{session_id}.json"
+            folded_path = self.output_dir / f"profile-{session_id}.folded"
+            self._export_trace(session.profiles, trace_path)
+            folded_path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in session.samples.most_common()),
+                encoding="utf-8"
+            )
+            
+            summary = {
+                "session_id": session_id,
+                "duration_s": elapsed,
+                "requests": session.requests,
+                "profiled_stages": len(session.profiles),
+                "unprofiled_stages": session.unprofiled_stages,
+                "trace_path": str(trace_path),
+                "folded_stacks_path": str(folded_path),
+                "stages": {
+                    name: {"calls": len(times), "total_ms": sum(times), "mean_ms": sum(times) / len(times)}
+                    for name, times in session.stage_times.items()
+                },
+                "top_operators": self._top_operators(session.profiles, top),
+                "top_python": self._top_python(session.samples, top)
+            }
+            (self.output_dir / f"profile-{session_id}.summary.json").write_text(
+                json.dumps(summary, indent=2), encoding="utf-8"
+            )
+            logger.info(f"Profiling session {session_id} finished after {session.requests} requests")
+            return summary
+        finally:
+            self._session = None
+            self._lock.release()
+    
+    @staticmethod
+    def _export_trace(profiles: List[Any], path: Path) -> None:
+        """One Chrome trace holding the events of every profiled stage"""
+        events: List[Any] = []
+        for index, prof in enumerate(profiles):
+            part = path.with_name(f"{path.stem}.part{index}.json")
+            prof.export_chrome_trace(str(part))
+            try:
+                events.extend(json.loads(part.read_text(encoding="utf-8")).get("traceEvents", []))
+            finally:
+                part.unlink()
+        path.write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+    
+    @staticmethod
+    def _top_operators(profiles: List[Any], top: int) -> List[Dict[str, Any]]:
+        """Operators with the most self time, summed over the profiled stages"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for prof in profiles:
+            for event in prof.key_averages():
+                operator = totals.setdefault(
+                    event.key,
+                    {"name": event.key, "calls": 0, "self_cpu_ms": 0.0, "cpu_total_ms": 0.0}
+                )
+                operator["calls"] += event.count
+                operator["self_cpu_ms"] += event.self_cpu_time_total / 1000
+                operator["cpu_total_ms"] += event.cpu_time_total / 1000
+                # Renamed to self_device_time_total in newer torch releases
+                device_time = getattr(event, "self_device_time_total", getattr(event, "self_cuda_time_total", 0))
+                if device_time:
+                    operator["self_device_ms"] = operator.get("self_device_ms", 0.0) + device_time / 1000
+        return sorted(totals.values(), key=lambda operator: operator["self_cpu_ms"], reverse=True)[:top]
+    
+    @staticmethod
+    def _top_python(samples: Counter, top: int) -> List[Dict[str, Any]]:
+        """Python functions seen most often at the top of a sampled stack"""
+        total = sum(samples.values())
+        leaves: Counter = Counter()
+        for stack, count in samples.items():
+            stage, _, frames = stack.partition(";")
+            leaves[(stage, frames.rsplit(";", 1)[-1])] += count
+        return [
+            {"stage": stage, "function": function, "samples": count, "share": count / total}
+            for (stage, function), count in leaves.most_common(top)
+        ]
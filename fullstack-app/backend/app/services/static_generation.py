@@ -0,0 +1,236 @@
+"""
+Static KV-cache and compiled-graph generation
+"""
+import copy
+import inspect
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (batch, input length, num_beams, cache length)
+BucketKey = Tuple[int, int, int, int]
+
+
+def _round_up(value: int, buckets: List[int]) -> Optional[int]:
+    """Smallest bucket that holds value, None if it is larger than all of them"""
+    index = bisect_left(buckets, value)
+    return buckets[index] if index < len(buckets) else None
+
+
+def _compiled_graphs() -> Optional[int]:
+    """Graphs compiled by dynamo so far, None if this torch does not count them"""
+    try:
+        from torch._dynamo.utils import counters
+    except ImportError:
+        return None
+    return counters["stats"]["unique_graphs"]
+
+
+def _static_cache(cache_class: Any, config: Any, rows: int, cache_len: int, device: torch.device, dtype: torch.dtype):
+    """Build a StaticCache across the constructor signatures of transformers releases"""
+    params = inspect.signature(cache_class.__init__).parameters
+    kwargs: Dict[str, Any] = {"config": config, "max_cache_len": cache_len}
+    if "max_batch_size" in params:
+        kwargs["max_batch_size"] = rows
+    elif "batch_size" in params:
+        kwargs["batch_size"] = rows
+    if "device" in params:
+        kwargs["device"] = device
+    if "dtype" in params:
+        kwargs["dtype"] = dtype
+    return cache_class(**kwargs)
+
+
+class _Bucket:
+    """Preallocated caches for one shape, used by one request at a time"""
+    
+    def __init__(self, cache: Any):
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.warm = False
+        self.uses = 0
+
+
+class StaticGenerationRunner:
+    """Runs generate with static KV caches and a compiled decoder step
+    
+    Inputs are padded up to a configured (batch, input length) bucket and the
+    self-attention cache is sized to an output-length bucket, so every decode
+    step sees the same tensor shapes and the compiled graph is reused. Cache
+    buffers are allocated once per bucket and reset between requests. Shapes
+    outside the warmed buckets return None so the caller can run eagerly.
+    """
+    
+    def __init__(
+        self,
+        model: Any,
+        batch_buckets: List[int],
+        input_buckets: List[int],
+        output_buckets: List[int],
+        beam_widths: List[int]
+    ):
+        from transformers import EncoderDecoderCache, StaticCache
+        
+        self._cache_classes = (EncoderDecoderCache, StaticCache)
+        self.model = model
+        self.batch_buckets = sorted(batch_buckets)
+        self.input_buckets = sorted(input_buckets)
+        self.output_buckets = sorted(output_buckets)
+        self.beam_widths = sorted(beam_widths)
+        self.pad_token_id = model.config.pad_token_id
+        self.enabled = True
+        self.static_calls = 0
+        self.eager_fallbacks = 0
+        self.uncompiled_buckets = 0
+        self._buckets: Dict[BucketKey, _Bucket] = {}
+        
+        # Every bucket is its own static shape, and dynamo stops compiling new
+        # shapes of a function past cache_size_limit (8 by default) and runs
+        # them eagerly, so leave room for all of them
+        import torch._dynamo
+        
+        buckets = (
+            len(self.batch_buckets) * len(self.input_buckets) * len(self.output_buckets) * len(self.beam_widths)
+        )
+        dynamo_config = torch._dynamo.config
+        for limit in ("cache_size_limit", "accumulated_cache_size_limit"):
+            if hasattr(dynamo_config, limit) and getattr(dynamo_config, limit) < 2 * buckets:
+                setattr(dynamo_config, limit, 2 * buckets)
+        
+        # A shallow copy shares parameters and submodules with the eager model
+        # but owns its forward, so eager requests never hit the compiled graph
+        self._compiled = copy.copy(model)
+        self._compiled.forward = torch.compile(model.forward, dynamic=False)
+    
+    def bucket_for(self, batch: int, input_length: int, num_beams: int, max_length: int) -> Optional[BucketKey]:
+        """Bucket a request shape falls into, None if no bucket fits"""
+        if num_beams not in self.beam_widths:
+            return None
+        key = (
+            _round_up(batch, self.batch_buckets),
+            _round_up(input_length, self.input_buckets),
+            num_beams,
+            _round_up(max_length, self.output_buckets)
+        )
+        return None if None in key else key
+    
+    def _new_cache(self, key: BucketKey) -> Any:
+        encoder_decoder_cache, static_cache = self._cache_classes
+        batch, input_length, num_beams, cache_len = key
+        rows = batch * num_beams
+        dtype = next(self.model.parameters()).dtype
+        device = next(self.model.parameters()).device
+        return encoder_decoder_cache(
+            _static_cache(static_cache, self.model.config, rows, cache_len, device, dtype),
+            _static_cache(static_cache, self.model.config, rows, input_length, device, dtype)
+        )
+    
+    def _run(
+        self,
+        bucket: _Bucket,
+        key: BucketKey,
+        inputs: Dict[str, torch.Tensor],
+        max_length: int,
+        stopping_criteria: Optional[Any] = None
+    ) -> torch.Tensor:
+        """Pad inputs to the bucket shape and generate with its cache"""
+        batch, input_length, num_beams, _ = key
+        input_ids = inputs["input_ids"]
+        attention_mask = inputs["attention_mask"]
+        real_batch, real_length = input_ids.shape
+        
+        pad_columns = input_length - real_length
+        if pad_columns:
+            input_ids = torch.nn.functional.pad(input_ids, (0, pad_columns), value=self.pad_token_id)
+            attention_mask = torch.nn.functional.pad(attention_mask, (0, pad_columns), value=0)
+        pad_rows = batch - real_batch
+        if pad_rows:
+            # Repeat the first row; its extra outputs are dropped
+            input_ids = torch.cat([input_ids, input_ids[:1].expand(pad_rows, -1)])
+            attention_mask = torch.cat([attention_mask, attention_mask[:1].expand(pad_rows, -1)])
+        
+        bucket.cache.reset()
+        outputs = self._compiled.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            past_key_values=bucket.cache,
+            num_beams=num_beams,
+            max_length=max_length,
+            early_stopping=True,
+            do_sample=False,
+            stopping_criteria=stopping_criteria
+        )
+        bucket.uses += 1
+        return outputs[:real_batch]
+    
+    def warm_up(self) -> None:
+        """Allocate caches and compile the decoder step for every bucket"""
+        for batch in self.batch_buckets:
+            for input_length in self.input_buckets:
+                for num_beams in self.beam_widths:
+                    for cache_len in self.output_buckets:
+                        key = (batch, input_length, num_beams, cache_len)
+                        bucket = _Bucket(self._new_cache(key))
+                        inputs = {
+                            "input_ids": torch.full((1, input_length), self.model.config.eos_token_id),
+                            "attention_mask": torch.ones((1, input_length), dtype=torch.long)
+                        }
+                        inputs = {name: tensor.to(self.model.device) for name, tensor in inputs.items()}
+                        graphs = _compiled_graphs()
+                        with torch.no_grad():
+                            # A few steps are enough to compile the step graph for this shape
+                            self._run(bucket, key, inputs, max_length=min(cache_len, 4))
+                        if graphs is not None and _compiled_graphs() == graphs:
+                            # Dynamo ran this shape eagerly; serve it as an eager fallback
+                            logger.warning(f"Static bucket {key} did not compile, it will run eagerly")
+                            self.uncompiled_buckets += 1
+                            continue
+                        bucket.warm = True
+                        bucket.uses = 0
+                        self._buckets[key] = bucket
+        logger.info(
+            f"Static generation warmed {len(self._buckets)} buckets, {self.uncompiled_buckets} did not compile"
+        )
+    
+    def generate(
+        self,
+        inputs: Dict[str, torch.Tensor],
+        num_beams: int,
+        max_length: int,
+        stopping_criteria: Optional[Any] = None
+    ) -> Optional[torch.Tensor]:
+        """Generate on a warmed bucket, or return None so the caller runs eagerly"""
+        batch, input_length = inputs["input_ids"].shape
+        key = self.bucket_for(batch, input_length, num_beams, max_length)
+        bucket = self._buckets.get(key) if key and self.enabled else None
+        # A busy bucket falls back too rather than waiting for its cache
+        if bucket is None or not bucket.warm or not bucket.lock.acquire(blocking=False):
+            self.eager_fallbacks += 1
+            return None
+        
+        try:
+            outputs = self._run(bucket, key, inputs, max_length, stopping_criteria)
+            self.static_calls += 1
+            return outputs
+        except Exception as e:
+            logger.error(f"Static generation failed, switching to eager: {e}")
+            self.enabled = False
+            self.eager_fallbacks += 1
+            return None
+        finally:
+            bucket.lock.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "buckets": len(self._buckets),
+            "uncompiled_buckets": self.uncompiled_buckets,
+            "static_calls": self.static_calls,
+            "eager_fallbacks": self.eager_fallbacks
+        }
@@ -2,64 +2,295 @@
 Translation service using Transformers
 """
 import asyncio
+import gc
+import math
+import threading
 import time
 import torch
-from typing import Optional, Dict, Any, List
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple, Union
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, StoppingCriteriaList
 
 from app.core.config import settings
+from app.core.cpu import configure_cpu, tuned_cpu_settings
 from app.core.logging import get_logger
-from app.models.schemas import TranslationResponse
+from app.models.schemas import TranslationHypothesis, TranslationResponse
+from app.services.admission import (
+    AdmissionRejected,
+    MemoryBudget,
+    detect_memory_budget,
+    estimate_generation_bytes,
+    is_out_of_memory
+)
+from app.services.cancellation import (
+    CancellationCriteria,
+    CancellationStats,
+    CancellationToken,
+    RequestCancelled
+)
+from app.services.masking import (
+    MaskingStats,
+    decode_keeping_placeholders,
+    mask_text,
+    restore,
+    supports_placeholders
+)
+from app.services.profiling import Profiler
+from app.services.static_generation import StaticGenerationRunner
+from app.services.versions import ModelVersion, ReloadInProgress
 
 logger = get_logger(__name__)
 
+SUPPORTED_QUANTIZATION = ("dynamic",)
+GENERATION_MODES = ("eager", "static")
+
+WARMUP_TEXT = "Hello, how are you?"
+
+# Best-first (text, length-normalized log-probability) pairs for one input;
+# scores are None unless they were requested
+Hypotheses = List[Tuple[str, Optional[float]]]
+
+
+def format_input(text: str, source_lang: str, target_lang: str) -> str:
+    """Format input text for T5 model"""
+    if source_lang == "en" and target_lang == "ta":
+        return f"translate English to Tamil: {text}"
+    elif source_lang == "ta" and target_lang == "en":
+        return f"translate Tamil to English: {text}"
+    else:
+        return f"translate {source_lang} to {target_lang}: {text}"
+
+
+def sequence_scores(model: AutoModelForSeq2SeqLM, outputs: Any, num_beams: int) -> List[float]:
+    """Length-normalized log-probability of each returned sequence"""
+    if num_beams > 1:
+        # Beam search already divides each hypothesis' log-probability by its length
+        return outputs.sequences_scores.tolist()
+    
+    # Greedy search: mean log-probability of the generated tokens, up to and including EOS
+    transition = model.compute_transition_scores(outputs.sequences, outputs.scores, normalize_logits=True)
+    generated = outputs.sequences[:, -transition.shape[1]:]
+    mask = generated != model.config.pad_token_id
+    total = torch.where(mask, transition, torch.zeros_like(transition)).sum(dim=-1)
+    return (total / mask.sum(dim=-1).clamp(min=1)).tolist()
+
 
 class TranslationService:
     """Neural Machine Translation Service"""
     
-    def __init__(self):
-        self.model: Optional[AutoModelForSeq2SeqLM] = None
-        self.tokenizer: Optional[AutoTokenizer] = None
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        quantization: Optional[str] = None,
+        device: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        generation_mode: Optional[str] = None,
+        masking: Optional[bool] = None
+    ):
+        self._active: Optional[ModelVersion] = None
+        # Guards switching versions against requests picking one up
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.model_path = model_path or settings.MODEL_PATH
+        self.quantization = quantization if quantization is not None else settings.QUANTIZATION
+        self.generation_mode = generation_mode or settings.GENERATION_MODE
+        if self.generation_mode not in GENERATION_MODES:
+            raise ValueError(f"Unsupported generation mode: {self.generation_mode}")
+        self.masking = masking if masking is not None else settings.MASK_UNTRANSLATABLE
+        self.masking_stats = MaskingStats()
+        self.cancellation_stats = CancellationStats()
+        self.profiler = Profiler(settings.PROFILE_DIR)
+        self.cpu_settings = tuned_cpu_settings()
+        self.batch_size = batch_size or self.cpu_settings["batch_size"]
+        if device:
+            self.device = torch.device(device)
+        else:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.memory_budget = MemoryBudget(
+            budget_bytes=settings.MEMORY_BUDGET_MB * 1024 * 1024 if settings.MEMORY_BUDGET_MB else None,
+            timeout_s=settings.ADMISSION_TIMEOUT_S
+        )
         self.model_info = {
             "name": "t5-small",
             "device": str(self.device),
             "loaded": False
         }
+    
+    @property
+    def model(self) -> Optional[AutoModelForSeq2SeqLM]:
+        """Model of the active version"""
+        return self._active.model if self._active else None
+    
+    @property
+    def tokenizer(self) -> Optional[AutoTokenizer]:
+        """Tokenizer of the active version"""
+        return self._active.tokenizer if self._active else None
+    
+    def _load_version(self, model_path: str, allow_fallback: bool = True) -> ModelVersion:
+        """Load, place and quantize a model version without activating it"""
+        logger.info(f"Loading model from {model_path}")
         
+        # Try to load saved model first
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(model_path)
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+            logger.info("Loaded custom trained model")
+            name = "custom-t5-en-ta"
+        except Exception as e:
+            if not allow_fallback:
+                raise
+            logger.warning(f"Could not load custom model: {e}")
+            logger.info("Loading fallback model: t5-small")
+            model_path = "t5-small"
+            tokenizer = AutoTokenizer.from_pretrained(model_path)
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+            name = "t5-small"
+        
+        # Move model to device
+        model.to(self.device)
+        model.eval()
+        
+        model = self._apply_quantization(model)
+        version = ModelVersion(model, tokenizer, model_path=model_path, name=name)
+        if self.generation_mode == "static":
+            version.static_runner = self._build_static_runner(model)
+        return version
+    
+    def _build_static_runner(self, model: AutoModelForSeq2SeqLM) -> Optional[StaticGenerationRunner]:
+        """Compile and warm the static-shape buckets, None to serve eagerly"""
+        try:
+            runner = StaticGenerationRunner(
+                model,
+                batch_buckets=settings.STATIC_BATCH_BUCKETS,
+                input_buckets=settings.STATIC_INPUT_BUCKETS,
+                output_buckets=settings.STATIC_OUTPUT_BUCKETS,
+                beam_widths=settings.STATIC_NUM_BEAMS
+            )
+            runner.warm_up()
+            return runner
+        except Exception as e:
+            logger.warning(f"Static generation unavailable, using eager generation: {e}")
+            return None
+    
+    def _activate(self, version: ModelVersion) -> Optional[ModelVersion]:
+        """Atomically route new requests to version, returning the previous one"""
+        with self._swap_lock:
+            previous, self._active = self._active, version
+            self.model_info.update({
+                "loaded": True,
+                "quantization": self.quantization,
+                "generation_mode": self.generation_mode,
+                "masking": self.masking,
+                "batch_size": self.batch_size
+            })
+        return previous
+    
+    @contextmanager
+    def _acquire_version(self) -> Iterator[ModelVersion]:
+        """Pin the active version for the duration of one request"""
+        with self._swap_lock:
+            version = self._active
+            if version is None:
+                raise RuntimeError("Translation service not ready")
+            version.acquire()
+        try:
+            yield version
+        finally:
+            version.release()
+    
     def load_model(self) -> None:
         """Load the translation model"""
         try:
-            logger.info(f"Loading model from {settings.MODEL_PATH}")
+            if self.device.type == "cpu":
+                self.model_info["cpu"] = configure_cpu(
+                    num_threads=self.cpu_settings["num_threads"],
+                    interop_threads=self.cpu_settings["interop_threads"],
+                    affinity=self.cpu_settings["affinity"],
+                    workers=self.cpu_settings["workers"]
+                )
             
-            # Try to load saved model first
-            try:
-                self.tokenizer = AutoTokenizer.from_pretrained(settings.MODEL_PATH)
-                self.model = AutoModelForSeq2SeqLM.from_pretrained(settings.MODEL_PATH)
-                logger.info("Loaded custom trained model")
-                self.model_info["name"] = "custom-t5-en-ta"
-            except Exception as e:
-                logger.warning(f"Could not load custom model: {e}")
-                logger.info("Loading fallback model: t5-small")
-                self.tokenizer = AutoTokenizer.from_pretrained("t5-small")
-                self.model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
+            version = self._load_version(self.model_path)
             
-            # Move model to device
-            self.model.to(self.device)
-            self.model.eval()
+            if self.memory_budget.budget_bytes is None:
+                self.memory_budget.set_budget(detect_memory_budget(self.device))
             
-            self.model_info.update({
-                "loaded": True,
-                "parameters": sum(p.numel() for p in self.model.parameters()),
-                "trainable_parameters": sum(p.numel() for p in self.model.parameters() if p.requires_grad)
-            })
+            self._activate(version)
             
             logger.info(f"Model loaded successfully on {self.device}")
-            
+        
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise RuntimeError(f"Failed to load translation model: {e}")
     
+    def reload_model(self, model_path: Optional[str] = None) -> Dict[str, Any]:
+        """Swap in a new model version without dropping requests
+        
+        The new version is loaded and warmed up while the current one keeps
+        serving. New requests then switch over atomically, and the old version
+        is freed once its in-flight requests have finished.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgress("A model reload is already in progress")
+        
+        try:
+            start_time = time.time()
+            version = self._load_version(model_path or self.model_path, allow_fallback=False)
+            self._warm_up(version)
+            load_time = (time.time() - start_time) * 1000
+            
+            previous = self._activate(version)
+            self.model_path = version.model_path
+            logger.info(f"Switched to model revision {version.revision}")
+            
+            drained = True
+            if previous is not None:
+                drained = previous.wait_drained(settings.RELOAD_DRAIN_TIMEOUT_S)
+                if drained:
+                    previous.unload()
+                else:
+                    # Memory is reclaimed once the remaining requests drop their reference
+                    logger.warning(
+                        f"{previous.in_flight} requests still on revision {previous.revision} "
+                        f"after {settings.RELOAD_DRAIN_TIMEOUT_S}s"
+                    )
+                gc.collect()
+                if self.device.type == "cuda":
+                    torch.cuda.empty_cache()
+            
+            return {
+                "previous_revision": previous.revision if previous else None,
+                "revision": version.revision,
+                "model_path": version.model_path,
+                "load_time_ms": load_time,
+                "drained": drained
+            }
+        finally:
+            self._reload_lock.release()
+    
+    def _warm_up(self, version: ModelVersion) -> None:
+        """Run a few translations so the first real requests skip one-time costs"""
+        for source_lang, target_lang in (("en", "ta"), ("ta", "en")):
+            self._generate(version, [WARMUP_TEXT], source_lang, target_lang, settings.DEFAULT_NUM_BEAMS, 32)
+    
+    def _apply_quantization(self, model: AutoModelForSeq2SeqLM) -> AutoModelForSeq2SeqLM:
+        """Quantize a loaded model if configured"""
+        if not self.quantization:
+            return model
+        if self.quantization not in SUPPORTED_QUANTIZATION:
+            raise ValueError(f"Unsupported quantization mode: {self.quantization}")
+        if self.device.type != "cpu":
+            logger.warning("Dynamic quantization is only supported on CPU, skipping")
+            self.quantization = None
+            return model
+        
+        model = torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        logger.info("Applied dynamic int8 quantization")
+        return model
+    
     async def load_model_async(self) -> None:
         """Load the translation model asynchronously"""
         loop = asyncio.get_event_loop()
@@ -67,76 +298,326 @@ class TranslationService:
     
     def is_ready(self) -> bool:
         """Check if the model is loaded and ready"""
-        return self.model is not None and self.tokenizer is not None
+        return self._active is not None
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
-        return self.model_info.copy()
-    
-    def _format_input(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Format input text for T5 model"""
-        if source_lang == "en" and target_lang == "ta":
-            return f"translate English to Tamil: {text}"
-        elif source_lang == "ta" and target_lang == "en":
-            return f"translate Tamil to English: {text}"
-        else:
-            return f"translate {source_lang} to {target_lang}: {text}"
+        info = self._info(self._active)
+        if self._active is not None and self._active.static_runner is not None:
+            info["static_generation"] = self._active.static_runner.stats()
+        if self.masking:
+            info["masking_stats"] = self.masking_stats.snapshot()
+        info["cancellation"] = self.cancellation_stats.snapshot()
+        return info
+    
+    def _info(self, version: Optional[ModelVersion]) -> Dict[str, Any]:
+        """Service information merged with that of a model version"""
+        info = self.model_info.copy()
+        if version is not None:
+            info.update(version.info)
+        return info
+    
+    def _generate(
+        self,
+        version: ModelVersion,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        num_beams: int,
+        max_length: int,
+        cancellation: Optional[Sequence[CancellationToken]] = None,
+        num_return_sequences: int = 1,
+        return_scores: bool = False,
+        keep_placeholders: bool = False
+    ) -> List[Union[Hypotheses, Exception]]:
+        """Run a single padded generate call over a list of texts
+        
+        Each text gets its num_return_sequences best hypotheses from the same
+        beam search, scored when return_scores is set. keep_placeholders keeps
+        sentinel tokens in the decoded text for texts that were masked. With
+        cancellation tokens (one per text), items cancelled mid-decode come back
+        as RequestCancelled and the call ends once all of them are.
+        """
+        input_texts = [format_input(text, source_lang, target_lang) for text in texts]
+        
+        # Tokenize
+        with self.profiler.stage("tokenize"):
+            inputs = version.tokenizer(
+                input_texts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_length
+            ).to(self.device)
+        
+        # Reserve the estimated peak memory before generating
+        estimate = estimate_generation_bytes(
+            version.model.config,
+            batch_size=len(texts),
+            input_length=inputs["input_ids"].shape[1],
+            num_beams=num_beams,
+            max_length=max_length,
+            output_scores=return_scores
+        )
+        
+        criteria = CancellationCriteria(list(cancellation), num_beams) if cancellation else None
+        stopping_criteria = StoppingCriteriaList([criteria]) if criteria else None
+        
+        # Stop waiting for memory once nobody is waiting for the result
+        all_cancelled = (lambda: all(token.is_cancelled() for token in cancellation)) if cancellation else None
+        reservation = self.memory_budget.reserve(estimate, all_cancelled, settings.DISCONNECT_POLL_INTERVAL_S)
+        
+        # Generate translation
+        try:
+            with reservation, self.profiler.stage("generate"), torch.no_grad():
+                outputs = None
+                # Static buckets only return plain sequences
+                plain = not return_scores and num_return_sequences == 1
+                if version.static_runner is not None and plain:
+                    outputs = version.static_runner.generate(inputs, num_beams, max_length, stopping_criteria)
+                if outputs is None:
+                    outputs = version.model.generate(
+                        **inputs,
+                        num_beams=num_beams,
+                        max_length=max_length,
+                        early_stopping=True,
+                        do_sample=False,
+                        stopping_criteria=stopping_criteria,
+                        num_return_sequences=num_return_sequences,
+                        output_scores=return_scores,
+                        return_dict_in_generate=return_scores
+                    )
+        except AdmissionRejected as e:
+            if e.reason != "cancelled":
+                raise
+            self.cancellation_stats.record_skipped(list(cancellation))
+            return [token.error() for token in cancellation]
+        
+        # Decode output, keeping placeholders only when masked spans need them
+        with self.profiler.stage("decode"):
+            sequences = outputs.sequences if return_scores else outputs
+            if keep_placeholders:
+                decoded = decode_keeping_placeholders(version.tokenizer, sequences)
+            else:
+                decoded = version.tokenizer.batch_decode(sequences, skip_special_tokens=True)
+            if return_scores:
+                scores: List[Optional[float]] = list(sequence_scores(version.model, outputs, num_beams))
+            else:
+                scores = [None] * len(decoded)
+            # generate returns the hypotheses of each input next to each other, best first
+            n = num_return_sequences
+            translations: List[Union[Hypotheses, Exception]] = [
+                list(zip(decoded[i * n:(i + 1) * n], scores[i * n:(i + 1) * n])) for i in range(len(texts))
+            ]
+        if criteria is not None:
+            self.cancellation_stats.record_generation(criteria, max_length, sequences.shape[-1])
+            for index in criteria.cancelled_at:
+                translations[index] = criteria.tokens[index].error()
+        return translations
+    
+    def _generate_safely(
+        self,
+        version: ModelVersion,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        num_beams: int,
+        max_length: int,
+        cancellation: Optional[Sequence[CancellationToken]] = None,
+        num_return_sequences: int = 1,
+        return_scores: bool = False,
+        keep_placeholders: bool = False
+    ) -> List[Union[Hypotheses, Exception]]:
+        """Generate translations, splitting the batch in halves on allocation failures
+        
+        Returns one translation or exception per text so a failing item does not
+        take its batch-mates down with it. Items already cancelled are dropped
+        from the batch before it reaches the model.
+        """
+        if cancellation:
+            live = [index for index, token in enumerate(cancellation) if not token.is_cancelled()]
+            if len(live) < len(texts):
+                results: List[Union[Hypotheses, Exception]] = [token.error() for token in cancellation]
+                self.cancellation_stats.record_skipped(
+                    [token for index, token in enumerate(cancellation) if index not in live]
+                )
+                if live:
+                    generated = self._generate_safely(
+                        version,
+                        [texts[index] for index in live],
+                        source_lang,
+                        target_lang,
+                        num_beams,
+                        max_length,
+                        [cancellation[index] for index in live],
+                        num_return_sequences,
+                        return_scores,
+                        keep_placeholders
+                    )
+                    for index, translation in zip(live, generated):
+                        results[index] = translation
+                return results
+        
+        try:
+            return self._generate(
+                version, texts, source_lang, target_lang, num_beams, max_length,
+                cancellation, num_return_sequences, return_scores, keep_placeholders
+            )
+        except Exception as e:
+            splittable = is_out_of_memory(e) or (
+                isinstance(e, AdmissionRejected) and e.reason == "too_large"
+            )
+            if not splittable or len(texts) == 1:
+                return [e] * len(texts)
+            
+            logger.warning(f"Splitting batch of {len(texts)} texts after: {e}")
+            self.memory_budget.record_split()
+            if self.device.type == "cuda":
+                torch.cuda.empty_cache()
+            middle = len(texts) // 2
+            first = cancellation[:middle] if cancellation else None
+            second = cancellation[middle:] if cancellation else None
+            return (
+                self._generate_safely(
+                    version, texts[:middle], source_lang, target_lang, num_beams, max_length,
+                    first, num_return_sequences, return_scores, keep_placeholders
+                )
+                + self._generate_safely(
+                    version, texts[middle:], source_lang, target_lang, num_beams, max_length,
+                    second, num_return_sequences, return_scores, keep_placeholders
+                )
+            )
+    
+    def _translate_texts(
+        self,
+        version: ModelVersion,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        num_beams: int,
+        max_length: int,
+        cancellation: Optional[Sequence[CancellationToken]] = None,
+        num_return_sequences: int = 1,
+        return_scores: bool = False
+    ) -> List[Union[Hypotheses, Exception]]:
+        """Translate texts with untranslatable spans masked
+        
+        Returns each text's hypotheses or exception. Texts with nothing to
+        translate never reach the model and come back unchanged and unscored.
+        """
+        if not self.masking or not supports_placeholders(version.tokenizer):
+            return self._generate_safely(
+                version, texts, source_lang, target_lang, num_beams, max_length,
+                cancellation, num_return_sequences, return_scores
+            )
+        
+        masked = [mask_text(text, target_lang) for text in texts]
+        pending = [index for index, item in enumerate(masked) if not item.passthrough]
+        translations: Dict[int, Union[Hypotheses, Exception]] = {}
+        if pending:
+            generated = self._generate_safely(
+                version,
+                [masked[index].text for index in pending],
+                source_lang,
+                target_lang,
+                num_beams,
+                max_length,
+                [cancellation[index] for index in pending] if cancellation else None,
+                num_return_sequences,
+                return_scores,
+                keep_placeholders=any(masked[index].spans for index in pending)
+            )
+            translations = dict(zip(pending, generated))
+        
+        results: List[Union[Hypotheses, Exception]] = []
+        for index, (text, item) in enumerate(zip(texts, masked)):
+            self.masking_stats.record(item)
+            if item.passthrough:
+                results.append([(text, None)])
+                continue
+            translation = translations[index]
+            if not isinstance(translation, Exception):
+                translation = [(restore(hypothesis, item), score) for hypothesis, score in translation]
+            results.append(translation)
+        return results
+    
+    @staticmethod
+    def _check_return_sequences(num_beams: int, num_return_sequences: int) -> None:
+        if not 1 <= num_return_sequences <= num_beams:
+            raise ValueError(f"num_return_sequences must be between 1 and num_beams ({num_beams})")
+    
+    @staticmethod
+    def _scored_fields(hypotheses: Hypotheses, num_return_sequences: int) -> Dict[str, Any]:
+        """Response fields for the best hypothesis, its score and the n-best list
+        
+        Unscored hypotheses (passthrough text the model never saw) get no
+        score fields and no n-best list.
+        """
+        text, score = hypotheses[0]
+        fields: Dict[str, Any] = {"translated_text": text}
+        if score is None:
+            return fields
+        fields["sequence_score"] = score
+        fields["confidence_score"] = math.exp(score)
+        if num_return_sequences > 1:
+            fields["alternatives"] = [
+                TranslationHypothesis(text=hypothesis, score=score, confidence=math.exp(score))
+                for hypothesis, score in hypotheses
+            ]
+        return fields
     
     def translate(
         self,
         text: str,
         source_lang: str = "en",
         target_lang: str = "ta",
-        num_beams: int = 4,
-        max_length: int = 512
+        num_beams: Optional[int] = 4,
+        max_length: Optional[int] = 512,
+        cancellation: Optional[CancellationToken] = None,
+        num_return_sequences: int = 1,
+        return_scores: bool = False
     ) -> TranslationResponse:
-        """Translate text"""
+        """Translate text, giving up early if cancellation is cancelled
+        
+        return_scores fills confidence_score and sequence_score; with
+        num_return_sequences > 1 (at most num_beams) the response also lists
+        the n best hypotheses of the same beam search, which implies scores.
+        """
         if not self.is_ready():
             raise RuntimeError("Translation service not ready")
+        # The API accepts null for both
+        num_beams = num_beams or settings.DEFAULT_NUM_BEAMS
+        max_length = max_length or settings.MAX_OUTPUT_LENGTH
+        self._check_return_sequences(num_beams, num_return_sequences)
         
         try:
             start_time = time.time()
             
-            # Format input
-            input_text = self._format_input(text, source_lang, target_lang)
-            
-            # Tokenize
-            inputs = self.tokenizer(
-                input_text,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=max_length
-            ).to(self.device)
-            
-            # Generate translation
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    num_beams=num_beams,
-                    max_length=max_length,
-                    early_stopping=True,
-                    do_sample=False
-                )
-            
-            # Decode output
-            translated_text = self.tokenizer.decode(
-                outputs[0],
-                skip_special_tokens=True
-            )
+            with self._acquire_version() as version:
+                hypotheses = self._translate_texts(
+                    version, [text], source_lang, target_lang, num_beams, max_length,
+                    [cancellation] if cancellation else None,
+                    num_return_sequences,
+                    return_scores or num_return_sequences > 1
+                )[0]
+            if isinstance(hypotheses, Exception):
+                raise hypotheses
             
             processing_time = (time.time() - start_time) * 1000
+            self.profiler.request_done()
             
             return TranslationResponse(
                 original_text=text,
-                translated_text=translated_text,
+                **self._scored_fields(hypotheses, num_return_sequences),
                 source_language=source_lang,
                 target_language=target_lang,
                 num_beams=num_beams,
                 processing_time_ms=processing_time,
-                model_info=self.model_info.copy()
+                model_info=self._info(version)
             )
-            
+        
+        except (AdmissionRejected, RequestCancelled):
+            raise
         except Exception as e:
             logger.error(f"Translation error: {e}")
             raise RuntimeError(f"Translation failed: {e}")
@@ -146,37 +627,67 @@ class TranslationService:
         texts: List[str],
         source_lang: str = "en",
         target_lang: str = "ta",
-        num_beams: int = 4,
-        max_length: int = 512
+        num_beams: Optional[int] = 4,
+        max_length: Optional[int] = 512,
+        cancellation: Optional[Sequence[CancellationToken]] = None,
+        num_return_sequences: int = 1,
+        return_scores: bool = False
     ) -> List[TranslationResponse]:
-        """Translate multiple texts"""
+        """Translate multiple texts, generating up to batch_size texts per model call
+        
+        cancellation holds one token per text; a cancelled text is dropped from
+        its chunk and reported as an error response. Scores and n-best lists
+        work as in translate and are length-normalized, so texts of different
+        lengths in one batch are comparable.
+        """
         if not self.is_ready():
             raise RuntimeError("Translation service not ready")
+        # The API accepts null for both
+        num_beams = num_beams or settings.DEFAULT_NUM_BEAMS
+        max_length = max_length or settings.MAX_OUTPUT_LENGTH
+        self._check_return_sequences(num_beams, num_return_sequences)
         
         results = []
-        for text in texts:
-            try:
-                result = self.translate(
-                    text=text,
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    num_beams=num_beams,
-                    max_length=max_length
+        # One version for the whole request, so a swap never splits a batch
+        with self._acquire_version() as version:
+            for start in range(0, len(texts), self.batch_size):
+                chunk = texts[start:start + self.batch_size]
+                tokens = cancellation[start:start + self.batch_size] if cancellation else None
+                start_time = time.time()
+                translations = self._translate_texts(
+                    version, chunk, source_lang, target_lang, num_beams, max_length, tokens,
+                    num_return_sequences,
+                    return_scores or num_return_sequences > 1
                 )
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Error translating text '{text}': {e}")
-                # Add error response
-                results.append(TranslationResponse(
-                    original_text=text,
-                    translated_text=f"Error: {str(e)}",
-                    source_language=source_lang,
-                    target_language=target_lang,
-                    num_beams=num_beams,
-                    processing_time_ms=0,
-                    model_info=self.model_info.copy()
-                ))
+                # Every item in a chunk waits for the whole generate call
+                processing_time = (time.time() - start_time) * 1000
+                
+                for text, hypotheses in zip(chunk, translations):
+                    if isinstance(hypotheses, Exception):
+                        logger.error(f"Error translating text '{text}': {hypotheses}")
+                        # Add error response
+                        results.append(TranslationResponse(
+                            original_text=text,
+                            translated_text=f"Error: {str(hypotheses)}",
+                            source_language=source_lang,
+                            target_language=target_lang,
+                            num_beams=num_beams,
+                            processing_time_ms=0,
+                            model_info=self._info(version)
+                        ))
+                        continue
+                    
+                    results.append(TranslationResponse(
+                        original_text=text,
+                        **self._scored_fields(hypotheses, num_return_sequences),
+                        source_language=source_lang,
+                        target_language=target_lang,
+                        num_beams=num_beams,
+                        processing_time_ms=processing_time,
+                        model_info=self._info(version)
+                    ))
         
+        self.profiler.request_done()
         return results
 
 
@@ -0,0 +1,83 @@
+"""
+Loaded model versions and in-flight request tracking for hot swaps
+"""
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Written by app.tools.trim_vocab next to a trimmed model
+VOCAB_MAP_FILE = "vocab_map.json"
+
+
+class ReloadInProgress(RuntimeError):
+    """Raised when a reload is requested while another one is running"""
+
+
+def model_revision(model_path: str) -> str:
+    """Short fingerprint of a model directory from its file names, sizes and mtimes"""
+    path = Path(model_path)
+    digest = hashlib.sha256()
+    if path.is_dir():
+        for file in sorted(path.iterdir()):
+            if file.is_file():
+                stat = file.stat()
+                digest.update(f"{file.name}:{stat.st_size}:{int(stat.st_mtime)}".encode("utf-8"))
+    else:
+        # Hub model id such as the t5-small fallback
+        digest.update(model_path.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class ModelVersion:
+    """A loaded model and tokenizer plus the requests currently using them"""
+    
+    def __init__(self, model: Any, tokenizer: Any, model_path: str, name: str):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.model_path = model_path
+        self.revision = model_revision(model_path)
+        self.info: Dict[str, Any] = {
+            "name": name,
+            "model_path": model_path,
+            "revision": self.revision,
+            "loaded_at": datetime.utcnow().isoformat(),
+            "vocab_size": model.config.vocab_size,
+            "trimmed_vocab": (Path(model_path) / VOCAB_MAP_FILE).is_file(),
+            "parameters": sum(p.numel() for p in model.parameters()),
+            "trainable_parameters": sum(p.numel() for p in model.parameters() if p.requires_grad)
+        }
+        # StaticGenerationRunner when GENERATION_MODE is "static"
+        self.static_runner: Optional[Any] = None
+        self._in_flight = 0
+        self._condition = threading.Condition()
+    
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+    def acquire(self) -> None:
+        with self._condition:
+            self._in_flight += 1
+    
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._condition.notify_all()
+    
+    def wait_drained(self, timeout_s: float) -> bool:
+        """Wait until no request uses this version, False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_flight == 0, timeout=timeout_s)
+    
+    def unload(self) -> None:
+        """Drop the model and tokenizer so their memory can be freed"""
+        self.model = None
+        self.tokenizer = None
+        self.static_runner = None
@@ -0,0 +1,3 @@
+"""
+Command line tools for evaluation and benchmarking
+"""
@@ -0,0 +1,216 @@
+"""
+Benchmark workload for TranslationService throughput and latency
+
+Usage:
+    python -m app.tools.benchmark --requests 64 --batch-size 8 --num-beams 4
+    
+    # Compare eager decoding with static KV caches and a compiled decoder step
+    python -m app.tools.benchmark --generation-mode eager,static
+    
+    # Measure the cost of returning confidence scores and 3-best lists
+    python -m app.tools.benchmark --scores off,on --num-return-sequences 3
+"""
+import argparse
+import json
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from app.core.config import settings
+from app.services.translation import TranslationService
+from app.utils.stats import summarize_latencies
+
+# Mixed short, medium and long inputs, roughly matching interactive traffic
+DEFAULT_WORKLOAD = [
+    "Hello, how are you?",
+    "Thank you for your help.",
+    "What time is it?",
+    "The weather is beautiful today.",
+    "I love learning new languages.",
+    "Please send me the report before the meeting tomorrow morning.",
+    "The train to Chennai leaves from platform three at half past six.",
+    "Our school library has more than ten thousand books in Tamil and English.",
+    "The doctor advised him to drink plenty of water and rest for a few days.",
+    "Farmers in the delta region are worried because the monsoon rains arrived late this year "
+    "and the water level in the reservoirs is lower than usual.",
+    "The city council announced that the new bus routes will connect the suburbs with the main "
+    "railway station and reduce travel time for thousands of daily commuters.",
+    "Students who complete the programme will receive a certificate and will be invited to "
+    "present their projects at the annual science exhibition held in the capital.",
+]
+
+
+def load_workload(size: int, test_file: Optional[Path] = None) -> List[str]:
+    """Build a workload of size texts, cycling through the source sentences"""
+    if test_file is None:
+        texts = DEFAULT_WORKLOAD
+    elif test_file.suffix in (".tsv", ".jsonl"):
+        from app.tools.evaluate import load_parallel_file
+        texts, _ = load_parallel_file(test_file)
+    else:
+        texts = [line.strip() for line in test_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return list(islice(cycle(texts), size))
+
+
+def run_workload(
+    service: TranslationService,
+    texts: List[str],
+    batch_size: int,
+    num_beams: int = settings.DEFAULT_NUM_BEAMS,
+    max_length: int = 128,
+    source_lang: str = "en",
+    target_lang: str = "ta",
+    return_scores: bool = False,
+    num_return_sequences: int = 1
+) -> Dict[str, Any]:
+    """Translate texts in batches and measure throughput, batch latency and per-token latency
+    
+    Response serialization is timed separately, since scores and n-best lists
+    grow the payload rather than the generate call.
+    """
+    latencies: List[float] = []
+    serialize_ms: List[float] = []
+    generated_tokens = 0
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        batch_start = time.perf_counter()
+        results = service.translate_batch(
+            chunk,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            num_beams=num_beams,
+            max_length=max_length,
+            num_return_sequences=num_return_sequences,
+            return_scores=return_scores
+        )
+        latencies.append((time.perf_counter() - batch_start) * 1000)
+        serialize_start = time.perf_counter()
+        for r in results:
+            r.model_dump_json()
+        serialize_ms.append((time.perf_counter() - serialize_start) * 1000)
+        # Counted outside the timed region
+        generated_tokens += sum(len(service.tokenizer(r.translated_text)["input_ids"]) for r in results)
+    elapsed = sum(latencies) / 1000
+    
+    return {
+        "sentences": len(texts),
+        "total_time_s": elapsed,
+        "sentences_per_sec": len(texts) / elapsed if elapsed > 0 else 0.0,
+        "generated_tokens": generated_tokens,
+        "ms_per_token": sum(latencies) / max(generated_tokens, 1),
+        "latencies_ms": latencies,
+        "batch_latency": summarize_latencies(latencies),
+        "serialize_ms_per_batch": sum(serialize_ms) / max(len(serialize_ms), 1)
+    }
+
+
+def count_allocations(
+    service: TranslationService,
+    texts: List[str],
+    num_beams: int = settings.DEFAULT_NUM_BEAMS,
+    max_length: int = 128
+) -> int:
+    """Number of tensor allocations made while translating one batch"""
+    def translate() -> None:
+        service.translate_batch(texts, num_beams=num_beams, max_length=max_length)
+    
+    if service.device.type == "cuda":
+        torch.cuda.synchronize()
+        before = torch.cuda.memory_stats()["allocation.all.allocated"]
+        translate()
+        torch.cuda.synchronize()
+        return torch.cuda.memory_stats()["allocation.all.allocated"] - before
+    
+    with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU], profile_memory=True) as prof:
+        translate()
+    return sum(1 for event in prof.events() if event.name == "[memory]" and event.cpu_memory_usage > 0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark translation throughput and latency")
+    parser.add_argument("--model-path", default=None, help="Model directory, defaults to MODEL_PATH")
+    parser.add_argument("--test-file", type=Path, default=None, help="Source sentences (.txt, .tsv or .jsonl)")
+    parser.add_argument("--requests", type=int, default=64, help="Number of sentences to translate")
+    parser.add_argument("--batch-size", type=int, default=settings.BATCH_SIZE)
+    parser.add_argument("--num-beams", type=int, default=settings.DEFAULT_NUM_BEAMS)
+    parser.add_argument("--max-length", type=int, default=512, help="Defaults to the API's default max_length")
+    parser.add_argument("--quantization", default=None, help="Quantization mode, e.g. 'dynamic'")
+    parser.add_argument(
+        "--generation-mode",
+        default=settings.GENERATION_MODE,
+        help="Comma separated generation modes to compare, e.g. eager,static"
+    )
+    parser.add_argument(
+        "--scores",
+        default="off",
+        help="Comma separated score settings to compare, e.g. off,on"
+    )
+    parser.add_argument(
+        "--num-return-sequences",
+        type=int,
+        default=1,
+        help="Hypotheses returned per text when scores are on"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    score_settings = [s.strip() for s in args.scores.split(",") if s.strip()]
+    if any(s not in ("off", "on") for s in score_settings):
+        parser.error("--scores takes off and/or on")
+    if args.num_return_sequences > args.num_beams:
+        parser.error("--num-return-sequences cannot exceed --num-beams")
+    
+    texts = load_workload(args.requests, args.test_file)
+    report: Dict[str, Any] = {"results": []}
+    for mode in [m.strip() for m in args.generation_mode.split(",") if m.strip()]:
+        service = TranslationService(
+            model_path=args.model_path,
+            quantization=args.quantization or "",
+            batch_size=args.batch_size,
+            generation_mode=mode
+        )
+        service.load_model()
+        
+        # Warm up
+        run_workload(service, texts[:args.batch_size], args.batch_size, args.num_beams, args.max_length)
+        allocations = count_allocations(service, texts[:args.batch_size], args.num_beams, args.max_length)
+        for scores in score_settings:
+            return_scores = scores == "on"
+            num_return_sequences = args.num_return_sequences if return_scores else 1
+            result = run_workload(
+                service,
+                texts,
+                args.batch_size,
+                args.num_beams,
+                args.max_length,
+                return_scores=return_scores,
+                num_return_sequences=num_return_sequences
+            )
+            result.pop("latencies_ms")
+            result["generation_mode"] = mode
+            result["return_scores"] = return_scores
+            result["num_return_sequences"] = num_return_sequences
+            result["allocations_per_batch"] = allocations
+            result["model_info"] = service.get_model_info()
+            report["results"].append(result)
+            
+            latency = result["batch_latency"]
+            label = f"{mode}, scores {scores}" + (f", n={num_return_sequences}" if return_scores else "")
+            print(
+                f"[{label}] sent/s={result['sentences_per_sec']:.2f} ms/token={result['ms_per_token']:.2f} "
+                f"batch p50={latency['p50_ms']:.1f}ms p95={latency['p95_ms']:.1f}ms p99={latency['p99_ms']:.1f}ms "
+                f"serialize/batch={result['serialize_ms_per_batch']:.2f}ms "
+                f"allocations/batch={result['allocations_per_batch']}"
+            )
+        del service
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
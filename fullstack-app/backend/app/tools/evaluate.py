@@ -0,0 +1,260 @@
+"""
+Batched quality and speed evaluation for TranslationService configurations
+
+Runs the real serving code over a local parallel test file, scores the output
+with BLEU and chrF and records throughput and latency. When a candidate
+configuration is given it is compared against the baseline and the command
+exits non-zero if quality drops by more than the allowed threshold.
+
+Usage:
+    python -m app.tools.evaluate --test-file data/test.en-ta.tsv \\
+        --baseline num_beams=4 \\
+        --candidate num_beams=2,quantization=dynamic \\
+        --max-bleu-drop 0.5 --max-chrf-drop 1.0 --output eval.json
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import sacrebleu
+import torch
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.translation import TranslationService
+from app.utils.stats import summarize_latencies
+
+logger = get_logger(__name__)
+
+
+class EvalConfig(BaseModel):
+    """A serving configuration to evaluate"""
+    name: str = Field(default="baseline", description="Label used in the report")
+    model_path: Optional[str] = Field(default=None, description="Model directory, defaults to MODEL_PATH")
+    quantization: Optional[str] = Field(default=None, description="Quantization mode, e.g. 'dynamic'")
+    device: Optional[str] = Field(default=None, description="Torch device (cpu, cuda)")
+    generation_mode: Optional[str] = Field(default=None, description="'eager' or 'static'")
+    masking: Optional[bool] = Field(default=None, description="Mask untranslatable spans, defaults to MASK_UNTRANSLATABLE")
+    batch_size: int = Field(default=settings.BATCH_SIZE, ge=1)
+    num_beams: int = Field(default=settings.DEFAULT_NUM_BEAMS, ge=1, le=10)
+    max_length: int = Field(default=128, ge=10, le=1024)
+    
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "EvalConfig":
+        """Parse a comma separated key=value specification"""
+        values: Dict[str, Any] = {"name": name}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            if "=" not in item:
+                raise ValueError(f"Invalid config item '{item}', expected key=value")
+            key, value = item.split("=", 1)
+            key = key.strip()
+            if key not in cls.model_fields:
+                raise ValueError(f"Unknown config key '{key}'")
+            values[key] = None if value.strip().lower() in ("", "none") else value.strip()
+        return cls(**values)
+    
+    def build_service(self) -> TranslationService:
+        """Create a translation service for this configuration"""
+        return TranslationService(
+            model_path=self.model_path,
+            quantization=self.quantization or "",
+            device=self.device,
+            batch_size=self.batch_size,
+            generation_mode=self.generation_mode,
+            masking=self.masking
+        )
+
+
+def load_parallel_file(path: Path, limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """Load source and reference sentences from a TSV or JSONL file
+    
+    TSV files hold one "source<TAB>reference" pair per line. JSONL files hold
+    one object per line with "source" and "target" keys.
+    """
+    sources: List[str] = []
+    references: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if path.suffix == ".jsonl":
+                record = json.loads(line)
+                source, reference = record["source"], record["target"]
+            else:
+                parts = line.split("\t")
+                if len(parts) < 2:
+                    raise ValueError(f"{path}:{line_no}: expected source and reference separated by a tab")
+                source, reference = parts[0], parts[1]
+            sources.append(source.strip())
+            references.append(reference.strip())
+            if limit and len(sources) >= limit:
+                break
+    
+    if not sources:
+        raise ValueError(f"No sentence pairs found in {path}")
+    return sources, references
+
+
+def evaluate_config(
+    config: EvalConfig,
+    sources: List[str],
+    references: List[str],
+    source_lang: str = "en",
+    target_lang: str = "ta"
+) -> Dict[str, Any]:
+    """Translate the test set with one configuration and score it"""
+    service = config.build_service()
+    service.load_model()
+    
+    try:
+        # Warm up so one-time allocations do not skew the first batch
+        service.translate_batch(
+            sources[:config.batch_size],
+            source_lang=source_lang,
+            target_lang=target_lang,
+            num_beams=config.num_beams,
+            max_length=config.max_length
+        )
+        
+        hypotheses: List[str] = []
+        batch_latencies: List[float] = []
+        errors = 0
+        start_time = time.perf_counter()
+        for start in range(0, len(sources), config.batch_size):
+            chunk = sources[start:start + config.batch_size]
+            batch_start = time.perf_counter()
+            results = service.translate_batch(
+                chunk,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                num_beams=config.num_beams,
+                max_length=config.max_length
+            )
+            batch_latencies.append((time.perf_counter() - batch_start) * 1000)
+            for result in results:
+                if result.translated_text.startswith("Error: "):
+                    errors += 1
+                    hypotheses.append("")
+                else:
+                    hypotheses.append(result.translated_text)
+        elapsed = time.perf_counter() - start_time
+        
+        bleu = sacrebleu.corpus_bleu(hypotheses, [references])
+        chrf = sacrebleu.corpus_chrf(hypotheses, [references])
+        
+        return {
+            "config": config.model_dump(),
+            "model_info": service.get_model_info(),
+            "sentences": len(sources),
+            "errors": errors,
+            "bleu": bleu.score,
+            "chrf": chrf.score,
+            "bleu_signature": str(bleu),
+            "sentences_per_sec": len(sources) / elapsed if elapsed > 0 else 0.0,
+            "total_time_s": elapsed,
+            "batch_latency": summarize_latencies(batch_latencies),
+            "samples": [
+                {"source": s, "reference": r, "hypothesis": h}
+                for s, r, h in list(zip(sources, references, hypotheses))[:5]
+            ]
+        }
+    finally:
+        # Free the model before the next configuration is loaded
+        del service
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    max_bleu_drop: float,
+    max_chrf_drop: float
+) -> Dict[str, Any]:
+    """Compare a candidate against the baseline and decide whether it passes"""
+    bleu_delta = candidate["bleu"] - baseline["bleu"]
+    chrf_delta = candidate["chrf"] - baseline["chrf"]
+    base_speed = baseline["sentences_per_sec"]
+    failures = []
+    if -bleu_delta > max_bleu_drop:
+        failures.append(f"BLEU dropped by {-bleu_delta:.2f} (allowed {max_bleu_drop:.2f})")
+    if -chrf_delta > max_chrf_drop:
+        failures.append(f"chrF dropped by {-chrf_delta:.2f} (allowed {max_chrf_drop:.2f})")
+    if candidate["errors"] > baseline["errors"]:
+        failures.append(f"{candidate['errors'] - baseline['errors']} more failed translations than baseline")
+    
+    return {
+        "bleu_delta": bleu_delta,
+        "chrf_delta": chrf_delta,
+        "speedup": candidate["sentences_per_sec"] / base_speed if base_speed else 0.0,
+        "passed": not failures,
+        "failures": failures
+    }
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    """Print a one-configuration summary"""
+    latency = result["batch_latency"]
+    print(
+        f"[{result['config']['name']}] BLEU={result['bleu']:.2f} chrF={result['chrf']:.2f} "
+        f"sent/s={result['sentences_per_sec']:.2f} batch p50={latency['p50_ms']:.1f}ms "
+        f"p95={latency['p95_ms']:.1f}ms errors={result['errors']}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate translation quality and speed of serving configurations")
+    parser.add_argument("--test-file", type=Path, required=True, help="Parallel test file (.tsv or .jsonl)")
+    parser.add_argument("--source-lang", default="en", help="Source language code")
+    parser.add_argument("--target-lang", default="ta", help="Target language code")
+    parser.add_argument("--limit", type=int, default=None, help="Only evaluate the first N pairs")
+    parser.add_argument("--baseline", default="", help="Baseline config as key=value pairs")
+    parser.add_argument("--candidate", default=None, help="Candidate config as key=value pairs")
+    parser.add_argument("--max-bleu-drop", type=float, default=0.5, help="Allowed BLEU drop of the candidate")
+    parser.add_argument("--max-chrf-drop", type=float, default=1.0, help="Allowed chrF drop of the candidate")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    
+    sources, references = load_parallel_file(args.test_file, args.limit)
+    configs = [EvalConfig.parse("baseline", args.baseline)]
+    if args.candidate is not None:
+        configs.append(EvalConfig.parse("candidate", args.candidate))
+    
+    report: Dict[str, Any] = {"test_file": str(args.test_file), "results": []}
+    for config in configs:
+        logger.info(f"Evaluating {config.name} on {len(sources)} sentences")
+        result = evaluate_config(config, sources, references, args.source_lang, args.target_lang)
+        report["results"].append(result)
+        _print_result(result)
+    
+    exit_code = 0
+    if len(report["results"]) == 2:
+        comparison = compare_results(*report["results"], args.max_bleu_drop, args.max_chrf_drop)
+        report["comparison"] = comparison
+        print(
+            f"BLEU delta={comparison['bleu_delta']:+.2f} chrF delta={comparison['chrf_delta']:+.2f} "
+            f"speedup={comparison['speedup']:.2f}x"
+        )
+        if not comparison["passed"]:
+            for failure in comparison["failures"]:
+                print(f"FAIL: {failure}")
+            exit_code = 1
+        else:
+            print("PASS")
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"Wrote report to {args.output}")
+    
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
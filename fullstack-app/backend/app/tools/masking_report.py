@@ -0,0 +1,93 @@
+"""
+Report of the input tokens saved by masking untranslatable spans
+
+Usage:
+    python -m app.tools.masking_report --test-file data/test.en-ta.tsv --target-lang ta
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from transformers import AutoTokenizer
+
+from app.core.config import settings
+from app.services.masking import mask_text, tokens_saved
+
+
+def read_texts(path: Path) -> List[str]:
+    """Source sentences from a .txt, .tsv or .jsonl file"""
+    if path.suffix in (".tsv", ".jsonl"):
+        from app.tools.evaluate import load_parallel_file
+        texts, _ = load_parallel_file(path)
+        return texts
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def masking_report(tokenizer: Any, texts: List[str], target_lang: str) -> Dict[str, Any]:
+    """Per-request spans, token counts and tokens saved, plus totals"""
+    requests = []
+    for text in texts:
+        masked = mask_text(text, target_lang)
+        original_tokens = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+        saved = tokens_saved(tokenizer, text, masked)
+        requests.append({
+            "text": text,
+            "spans": masked.kinds,
+            "passthrough": masked.passthrough,
+            "original_tokens": original_tokens,
+            "model_tokens": 0 if masked.passthrough else original_tokens - saved,
+            "tokens_saved": saved
+        })
+    
+    original_total = sum(r["original_tokens"] for r in requests)
+    saved_total = sum(r["tokens_saved"] for r in requests)
+    return {
+        "requests": requests,
+        "total": {
+            "requests": len(requests),
+            "masked_requests": sum(1 for r in requests if r["spans"]),
+            "passthrough": sum(1 for r in requests if r["passthrough"]),
+            "original_tokens": original_total,
+            "tokens_saved": saved_total,
+            "saved_pct": 100.0 * saved_total / original_total if original_total else 0.0
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report input tokens saved by placeholder masking")
+    parser.add_argument("--test-file", type=Path, required=True, help="Source sentences (.txt, .tsv or .jsonl)")
+    parser.add_argument("--model-path", default=settings.MODEL_PATH, help="Model directory for the tokenizer")
+    parser.add_argument("--target-lang", default="ta")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    
+    if Path(args.model_path).is_dir():
+        tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    else:
+        tokenizer = AutoTokenizer.from_pretrained("t5-small")
+    report = masking_report(tokenizer, read_texts(args.test_file), args.target_lang)
+    
+    for index, request in enumerate(report["requests"], 1):
+        spans = ",".join(request["spans"]) or "-"
+        mode = "passthrough" if request["passthrough"] else "model"
+        print(
+            f"{index:>5} {mode:<11} tokens={request['original_tokens']:>4} "
+            f"saved={request['tokens_saved']:>4} spans={spans}"
+        )
+    total = report["total"]
+    print(
+        f"total requests={total['requests']} masked={total['masked_requests']} "
+        f"passthrough={total['passthrough']} tokens saved={total['tokens_saved']}/{total['original_tokens']} "
+        f"({total['saved_pct']:.1f}%)"
+    )
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Replay captured translation traffic and report latency, throughput and errors
+
+Capture traffic by starting the API with CAPTURE_FILE set (CAPTURE_REDACT=true
+logs text lengths only; replay then sends filler text of the same length).
+
+Usage:
+    # Against a running server at the original rate
+    python -m app.tools.replay --capture capture.jsonl --url http://127.0.0.1:8000
+    
+    # Against the app in this process at three times the original rate
+    python -m app.tools.replay --capture capture.jsonl --speed 3
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from itertools import cycle
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.capture import REQUEST_FIELDS
+from app.core.logging import get_logger
+from app.utils.stats import summarize_latencies
+
+logger = get_logger(__name__)
+
+FILLER_WORDS = (
+    "the weather in the city was pleasant and the students walked to the library "
+    "before the evening train left the station for the coast"
+).split()
+
+
+def load_capture(path: Path, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Captured records in arrival order"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record["ts"])
+    return records[:limit] if limit else records
+
+
+def filler_text(length: int) -> str:
+    """English filler of roughly length characters, standing in for redacted text"""
+    words: List[str] = []
+    size = 0
+    for word in cycle(FILLER_WORDS):
+        if size >= length:
+            break
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:max(length, 1)]
+
+
+def build_payload(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Request body for a captured record"""
+    texts = record.get("texts")
+    if texts is None:
+        texts = [filler_text(length) for length in record.get("lengths", [])]
+    payload: Dict[str, Any] = {field: record[field] for field in REQUEST_FIELDS if field in record}
+    if record["path"].endswith("/batch"):
+        payload["texts"] = texts
+    else:
+        payload["text"] = texts[0] if texts else ""
+    return payload
+
+
+async def send(client: httpx.AsyncClient, record: Dict[str, Any], scheduled: float) -> Dict[str, Any]:
+    """Post one record and time it"""
+    payload = build_payload(record)
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        "path": record["path"],
+        "texts": len(payload.get("texts", [payload.get("text")])),
+        "lag_ms": (start - scheduled) * 1000
+    }
+    try:
+        response = await client.post(record["path"], json=payload)
+        result["status"] = response.status_code
+    except httpx.HTTPError as e:
+        result["status"] = None
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+async def replay(client: httpx.AsyncClient, records: List[Dict[str, Any]], speed: float = 1.0) -> Dict[str, Any]:
+    """Send records with their captured inter-arrival times divided by speed"""
+    first = records[0]["ts"]
+    start = time.perf_counter()
+    tasks = []
+    for record in records:
+        scheduled = start + (record["ts"] - first) / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(client, record, scheduled)))
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return summarize_replay(results, elapsed)
+
+
+def summarize_replay(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles, throughput and error rate of a replay"""
+    ok = [r for r in results if r["status"] == 200]
+    statuses: Dict[str, int] = {}
+    for r in results:
+        key = str(r["status"]) if r["status"] is not None else "connection_error"
+        statuses[key] = statuses.get(key, 0) + 1
+    
+    by_path = {}
+    for path in sorted({r["path"] for r in results}):
+        latencies = [r["latency_ms"] for r in ok if r["path"] == path]
+        by_path[path] = summarize_latencies(latencies)
+    
+    return {
+        "requests": len(results),
+        "duration_s": elapsed,
+        "requests_per_sec": len(results) / elapsed if elapsed > 0 else 0.0,
+        "sentences_per_sec": sum(r["texts"] for r in ok) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": 1 - len(ok) / len(results) if results else 0.0,
+        "statuses": statuses,
+        "latency": summarize_latencies([r["latency_ms"] for r in ok]),
+        "latency_by_path": by_path,
+        # How far the driver fell behind the schedule; large values mean the
+        # driver, not the server, limited the offered rate
+        "schedule_lag": summarize_latencies([r["lag_ms"] for r in results])
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    records = load_capture(args.capture, args.limit)
+    if not records:
+        raise ValueError(f"No records in {args.capture}")
+    
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from app.main import app
+        from app.services.translation import translation_service
+        
+        # ASGITransport does not run the lifespan, so load the model here
+        await translation_service.load_model_async()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://replay",
+            timeout=args.timeout
+        )
+    
+    async with client:
+        return await replay(client, records, args.speed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured translation traffic")
+    parser.add_argument("--capture", type=Path, required=True, help="JSONL log written with CAPTURE_FILE")
+    parser.add_argument("--url", default=None, help="Server base URL; defaults to the app in this process")
+    parser.add_argument("--speed", type=float, default=1.0, help="Rate multiplier, 2 replays twice as fast")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N records")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    
+    report = asyncio.run(run(args))
+    latency = report["latency"]
+    print(
+        f"requests={report['requests']} duration={report['duration_s']:.1f}s "
+        f"req/s={report['requests_per_sec']:.2f} sent/s={report['sentences_per_sec']:.2f} "
+        f"errors={report['error_rate']:.1%}"
+    )
+    print(
+        f"latency p50={latency['p50_ms']:.1f}ms p95={latency['p95_ms']:.1f}ms "
+        f"p99={latency['p99_ms']:.1f}ms max={latency['max_ms']:.1f}ms statuses={report['statuses']}"
+    )
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
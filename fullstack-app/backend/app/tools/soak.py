@@ -0,0 +1,368 @@
+"""
+Soak test for memory growth and latency drift
+
+Drives TranslationService directly and through the API for a fixed duration
+with mixed input lengths, beam widths and output lengths, sampling RSS, the
+Python heap, live tensors and latency percentiles at a fixed interval. The run
+fails if memory grows steadily or tail latency drifts past the thresholds, so
+it can gate a release.
+
+By default it runs offline against a tiny randomly initialized T5 model built
+on the fly; pass --model-path to soak a real model instead.
+
+Usage:
+    python -m app.tools.soak --duration 30m --concurrency 4 --output soak.json
+    python -m app.tools.soak --duration 2h --model-path ./saved_model --max-rss-growth-mb 100
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from app.core.logging import get_logger
+from app.utils.stats import summarize_latencies
+
+logger = get_logger(__name__)
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: str) -> float:
+    """Seconds from values like '90', '90s', '30m', '2h' or '1d'"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid duration '{value}'")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def create_tiny_model(output_dir: Path, corpus: List[str], seed: int = 0) -> Path:
+    """Save a randomly initialized two-layer T5 and a tokenizer trained on corpus
+    
+    Needs no network access. The tokenizer has the usual T5 special and
+    sentinel tokens so every serving feature runs unchanged.
+    """
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, processors, trainers
+    from transformers import T5Config, T5ForConditionalGeneration, T5TokenizerFast
+    
+    backend = Tokenizer(models.Unigram())
+    backend.pre_tokenizer = pre_tokenizers.Metaspace()
+    backend.decoder = decoders.Metaspace()
+    backend.train_from_iterator(
+        corpus,
+        trainers.UnigramTrainer(vocab_size=512, special_tokens=["<pad>", "</s>", "<unk>"], unk_token="<unk>")
+    )
+    backend.post_processor = processors.TemplateProcessing(
+        single="$A </s>",
+        pair="$A </s> $B </s>",
+        special_tokens=[("</s>", backend.token_to_id("</s>"))]
+    )
+    tokenizer = T5TokenizerFast(
+        tokenizer_object=backend,
+        pad_token="<pad>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        extra_ids=100
+    )
+    
+    torch.manual_seed(seed)
+    config = T5Config(
+        vocab_size=len(tokenizer),
+        d_model=64,
+        d_kv=16,
+        d_ff=128,
+        num_layers=2,
+        num_decoder_layers=2,
+        num_heads=4,
+        pad_token_id=tokenizer.pad_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.pad_token_id
+    )
+    model = T5ForConditionalGeneration(config)
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)
+    model.save_pretrained(output_dir)
+    return output_dir
+
+
+def rss_mb() -> float:
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def memory_sample() -> Dict[str, Any]:
+    """Process, Python heap and tensor memory at this moment"""
+    tensors = [obj for obj in gc.get_objects() if torch.is_tensor(obj)]
+    sample = {
+        "rss_mb": rss_mb(),
+        "python_blocks": sys.getallocatedblocks(),
+        "gc_objects": len(gc.get_objects()),
+        "live_tensors": len(tensors),
+        "tensor_mb": sum(t.element_size() * t.nelement() for t in tensors) / (1024 * 1024)
+    }
+    if torch.cuda.is_available():
+        sample["cuda_allocated_mb"] = torch.cuda.memory_allocated() / (1024 * 1024)
+        sample["cuda_reserved_mb"] = torch.cuda.memory_reserved() / (1024 * 1024)
+    return sample
+
+
+class SoakDriver:
+    """Worker threads that keep the service and the API busy with a random request mix"""
+    
+    def __init__(self, service: Any, client: Any, texts: List[str], options: Dict[str, Any], seed: int = 0):
+        self.service = service
+        self.client = client
+        self.texts = texts
+        self.options = options
+        self.seed = seed
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latencies: List[float] = []
+        self.requests = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+    
+    def _request(self, rng: random.Random) -> None:
+        num_beams = rng.choice(self.options["num_beams"])
+        max_length = rng.choice(self.options["max_lengths"])
+        batch = rng.choice(self.options["batch_sizes"])
+        texts = [rng.choice(self.texts) for _ in range(batch)]
+        
+        if self.client is not None and rng.random() < self.options["api_share"]:
+            if batch == 1:
+                path, payload = "/api/v1/translate", {"text": texts[0]}
+            else:
+                path, payload = "/api/v1/translate/batch", {"texts": texts}
+            payload.update(num_beams=num_beams, max_length=max_length)
+            response = self.client.post(path, json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code} from {path}")
+        elif batch == 1:
+            self.service.translate(texts[0], num_beams=num_beams, max_length=max_length)
+        else:
+            results = self.service.translate_batch(texts, num_beams=num_beams, max_length=max_length)
+            failed = [r.translated_text for r in results if r.translated_text.startswith("Error: ")]
+            if failed:
+                raise RuntimeError(failed[0])
+    
+    def _worker(self, index: int) -> None:
+        rng = random.Random(self.seed + index)
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            try:
+                self._request(rng)
+                error = None
+            except Exception as e:
+                error = str(e)
+            latency = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.requests += 1
+                if error:
+                    self.errors += 1
+                    self.last_error = error
+                else:
+                    self._latencies.append(latency)
+    
+    def drain_latencies(self) -> List[float]:
+        """Latencies recorded since the previous call"""
+        with self._lock:
+            latencies, self._latencies = self._latencies, []
+        return latencies
+    
+    def start(self, concurrency: int) -> List[threading.Thread]:
+        threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+
+def _quarters(values: List[float]) -> List[List[float]]:
+    size = max(len(values) // 4, 1)
+    return [values[i * size:(i + 1) * size] for i in range(4)]
+
+
+def detect_growth(samples: List[Dict[str, Any]], metric: str, threshold: float, relative: bool = False) -> Dict[str, Any]:
+    """Flag a metric whose quarter medians rise steadily by more than threshold
+    
+    Each quarter's median must exceed the previous one, which ignores one-off
+    spikes and step changes that level off. threshold is absolute, or a
+    percentage of the first quarter when relative is set.
+    """
+    values = [s[metric] for s in samples if metric in s]
+    quarters = [sorted(q) for q in _quarters(values) if q]
+    medians = [q[len(q) // 2] for q in quarters]
+    if len(medians) < 4:
+        return {"metric": metric, "flagged": False, "reason": "not enough samples"}
+    
+    growth = medians[-1] - medians[0]
+    if relative:
+        growth = 100.0 * growth / medians[0] if medians[0] else 0.0
+    monotonic = all(later > earlier for earlier, later in zip(medians, medians[1:]))
+    return {
+        "metric": metric,
+        "quarter_medians": medians,
+        "growth": growth,
+        "unit": "%" if relative else "abs",
+        "monotonic": monotonic,
+        "flagged": monotonic and growth > threshold
+    }
+
+
+def detect_latency_drift(windows: List[Dict[str, Any]], threshold_pct: float) -> Dict[str, Any]:
+    """Compare tail latency of the first and last quarter of the run"""
+    quarters = _quarters(windows)
+    first = [latency for w in quarters[0] for latency in w["latencies_ms"]]
+    last = [latency for w in quarters[-1] for latency in w["latencies_ms"]]
+    if not first or not last:
+        return {"flagged": False, "reason": "not enough samples"}
+    
+    first_summary = summarize_latencies(first)
+    last_summary = summarize_latencies(last)
+    drift = {
+        pct: 100.0 * (last_summary[f"{pct}_ms"] - first_summary[f"{pct}_ms"]) / first_summary[f"{pct}_ms"]
+        for pct in ("p50", "p95", "p99")
+        if first_summary[f"{pct}_ms"] > 0
+    }
+    return {
+        "first_quarter": first_summary,
+        "last_quarter": last_summary,
+        "drift_pct": drift,
+        "flagged": drift.get("p95", 0.0) > threshold_pct or drift.get("p99", 0.0) > threshold_pct
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Soak test for memory growth and latency drift")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("10m"), help="e.g. 600, 30m, 2h")
+    parser.add_argument("--sample-interval", type=parse_duration, default=parse_duration("10s"))
+    parser.add_argument("--warmup", type=float, default=0.2, help="Fraction of the run excluded from checks")
+    parser.add_argument("--model-path", default=None, help="Model to soak; defaults to a tiny random model")
+    parser.add_argument("--concurrency", type=int, default=2, help="Worker threads sending requests")
+    parser.add_argument("--num-beams", type=_parse_ints, default=[1, 2, 4])
+    parser.add_argument("--max-lengths", type=_parse_ints, default=[16, 32, 64])
+    parser.add_argument("--batch-sizes", type=_parse_ints, default=[1, 1, 4, 8])
+    parser.add_argument("--api-share", type=float, default=0.5, help="Share of requests sent through the API")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50.0)
+    parser.add_argument("--max-heap-growth-pct", type=float, default=10.0)
+    parser.add_argument("--max-tensor-growth", type=float, default=100.0, help="Growth in live tensor count")
+    parser.add_argument("--max-latency-drift-pct", type=float, default=25.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write samples and findings as JSON")
+    args = parser.parse_args(argv)
+    
+    if args.model_path is None:
+        # Before transformers is imported, so nothing reaches for the hub
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    
+    from fastapi.testclient import TestClient
+    
+    from app.main import app
+    from app.services.translation import translation_service
+    from app.tools.benchmark import DEFAULT_WORKLOAD
+    
+    tmp_dir = None
+    if args.model_path is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="soak-model-")
+        corpus = DEFAULT_WORKLOAD + [f"translate English to Tamil: {text}" for text in DEFAULT_WORKLOAD]
+        args.model_path = str(create_tiny_model(Path(tmp_dir.name), corpus, args.seed))
+    # The API serves the global service, so both paths share one model
+    translation_service.model_path = args.model_path
+    
+    samples: List[Dict[str, Any]] = []
+    windows: List[Dict[str, Any]] = []
+    options = {
+        "num_beams": args.num_beams,
+        "max_lengths": args.max_lengths,
+        "batch_sizes": args.batch_sizes,
+        "api_share": args.api_share
+    }
+    # Entering the client runs the app's lifespan, which loads the model
+    with TestClient(app) as client:
+        driver = SoakDriver(translation_service, client, DEFAULT_WORKLOAD, options, args.seed)
+        start = time.monotonic()
+        threads = driver.start(args.concurrency)
+        try:
+            while time.monotonic() - start < args.duration:
+                time.sleep(min(args.sample_interval, max(args.duration - (time.monotonic() - start), 0)))
+                latencies = driver.drain_latencies()
+                sample = memory_sample()
+                sample.update(elapsed_s=time.monotonic() - start, requests=driver.requests, errors=driver.errors)
+                sample.update({f"latency_{k}": v for k, v in summarize_latencies(latencies).items()})
+                samples.append(sample)
+                windows.append({"elapsed_s": sample["elapsed_s"], "latencies_ms": latencies})
+                print(
+                    f"[{sample['elapsed_s']:>7.0f}s] rss={sample['rss_mb']:.1f}MB "
+                    f"blocks={sample['python_blocks']} tensors={sample['live_tensors']} "
+                    f"p95={sample['latency_p95_ms']:.1f}ms requests={driver.requests} errors={driver.errors}"
+                )
+        finally:
+            driver.stop.set()
+            for thread in threads:
+                thread.join()
+    
+    skip = int(len(samples) * args.warmup)
+    checked = samples[skip:]
+    memory_checks = [
+        detect_growth(checked, "rss_mb", args.max_rss_growth_mb),
+        detect_growth(checked, "python_blocks", args.max_heap_growth_pct, relative=True),
+        detect_growth(checked, "live_tensors", args.max_tensor_growth)
+    ]
+    if torch.cuda.is_available():
+        memory_checks.append(detect_growth(checked, "cuda_allocated_mb", args.max_rss_growth_mb))
+    latency_check = detect_latency_drift(windows[skip:], args.max_latency_drift_pct)
+    findings = [c["metric"] for c in memory_checks if c["flagged"]]
+    if latency_check["flagged"]:
+        findings.append("latency_drift")
+    
+    report = {
+        "duration_s": args.duration,
+        "model_path": None if tmp_dir else args.model_path,
+        "requests": driver.requests,
+        "errors": driver.errors,
+        "last_error": driver.last_error,
+        "memory_checks": memory_checks,
+        "latency_check": latency_check,
+        "findings": findings,
+        "samples": samples
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if tmp_dir:
+        tmp_dir.cleanup()
+    
+    for check in memory_checks:
+        if "growth" in check:
+            unit = "%" if check["unit"] == "%" else ""
+            print(f"{check['metric']}: growth={check['growth']:.1f}{unit} monotonic={check['monotonic']}")
+    if "drift_pct" in latency_check:
+        print(f"latency drift: {', '.join(f'{k}={v:+.1f}%' for k, v in latency_check['drift_pct'].items())}")
+    print(f"requests={driver.requests} errors={driver.errors} findings={findings or 'none'}")
+    return 1 if findings or driver.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Target-vocabulary trimming
+
+Builds a reduced vocabulary from a corpus, shrinks the embedding and output
+projection of the model to match and saves a remapped model and tokenizer
+that TranslationService.load_model serves like any other saved model. Every
+special token, every sentinel token and every single-character piece is kept
+so unseen words still tokenize without falling back to <unk>.
+
+Usage:
+    python -m app.tools.trim_vocab --model-path ./saved_model \\
+        --corpus data/train.en-ta.tsv --output ./saved_model-trimmed \\
+        --test-file data/test.en-ta.tsv --report trim_report.json
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import torch
+from torch import nn
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+from app.core.logging import get_logger
+from app.services.translation import format_input
+from app.services.versions import VOCAB_MAP_FILE
+from app.tools.benchmark import DEFAULT_WORKLOAD
+
+logger = get_logger(__name__)
+
+LANGUAGE_PAIRS = [("en", "ta"), ("ta", "en")]
+
+
+def read_corpus(path: Path) -> Iterable[str]:
+    """Yield every sentence of a .txt, .tsv or .jsonl corpus, both sides for parallel files"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if path.suffix == ".jsonl":
+                record = json.loads(line)
+                yield from (record[key] for key in ("source", "target") if key in record)
+            elif path.suffix == ".tsv":
+                yield from line.split("\t")[:2]
+            else:
+                yield line
+
+
+def collect_token_counts(tokenizer, sentences: Iterable[str], batch_size: int = 256) -> Counter:
+    """Count token ids used by the corpus, including the task prefixes the service adds"""
+    counts: Counter = Counter()
+    batch: List[str] = []
+    for sentence in sentences:
+        for source_lang, target_lang in LANGUAGE_PAIRS:
+            batch.append(format_input(sentence, source_lang, target_lang))
+        if len(batch) >= batch_size:
+            for ids in tokenizer(batch, add_special_tokens=True)["input_ids"]:
+                counts.update(ids)
+            batch = []
+    if batch:
+        for ids in tokenizer(batch, add_special_tokens=True)["input_ids"]:
+            counts.update(ids)
+    return counts
+
+
+def select_vocabulary(tokenizer, counts: Counter, min_count: int) -> List[int]:
+    """Old token ids to keep, sorted so special tokens keep their positions"""
+    pieces = json.loads(tokenizer.backend_tokenizer.to_str())["model"]["vocab"]
+    
+    keep = {token_id for token_id, count in counts.items() if count >= min_count}
+    keep.update(tokenizer.all_special_ids)
+    keep.update(tokenizer.convert_tokens_to_ids(tokenizer.additional_special_tokens))
+    for token_id, (piece, _) in enumerate(pieces):
+        # Single characters, with or without the word boundary marker
+        if len(piece.lstrip("▁")) <= 1:
+            keep.add(token_id)
+    return sorted(keep)
+
+
+def remap_tokenizer_files(output_dir: Path, kept_ids: List[int]) -> None:
+    """Rewrite the saved tokenizer files to use the new, dense token ids"""
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+    
+    tokenizer_path = output_dir / "tokenizer.json"
+    data = json.loads(tokenizer_path.read_text(encoding="utf-8"))
+    model = data["model"]
+    model["vocab"] = [model["vocab"][old] for old in kept_ids]
+    model["unk_id"] = old_to_new[model["unk_id"]]
+    data["added_tokens"] = [
+        {**token, "id": old_to_new[token["id"]]}
+        for token in data["added_tokens"]
+        if token["id"] in old_to_new
+    ]
+    special_tokens = (data.get("post_processor") or {}).get("special_tokens", {})
+    for token in special_tokens.values():
+        token["ids"] = [old_to_new[i] for i in token["ids"]]
+    tokenizer_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    
+    # A copied SentencePiece model would still use the original ids
+    (output_dir / "spiece.model").unlink(missing_ok=True)
+    
+    config_path = output_dir / "tokenizer_config.json"
+    if config_path.is_file():
+        config = json.loads(config_path.read_text(encoding="utf-8"))
+        if "added_tokens_decoder" in config:
+            config["added_tokens_decoder"] = {
+                str(old_to_new[int(old)]): token
+                for old, token in config["added_tokens_decoder"].items()
+                if int(old) in old_to_new
+            }
+        config_path.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def shrink_model(model, kept_ids: List[int]) -> None:
+    """Keep only the selected rows of the embedding and output projection"""
+    index = torch.tensor(kept_ids, dtype=torch.long)
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+    
+    input_embeddings = model.get_input_embeddings()
+    output_embeddings = model.get_output_embeddings()
+    tied = output_embeddings is not None and output_embeddings.weight is input_embeddings.weight
+    
+    new_input = nn.Embedding(len(kept_ids), input_embeddings.embedding_dim)
+    new_input.weight.data = input_embeddings.weight.data[index].clone()
+    model.set_input_embeddings(new_input)
+    
+    if output_embeddings is not None and not tied:
+        new_output = nn.Linear(output_embeddings.in_features, len(kept_ids), bias=output_embeddings.bias is not None)
+        new_output.weight.data = output_embeddings.weight.data[index].clone()
+        if output_embeddings.bias is not None:
+            new_output.bias.data = output_embeddings.bias.data[index].clone()
+        model.set_output_embeddings(new_output)
+    
+    model.config.vocab_size = len(kept_ids)
+    for config in (model.config, model.generation_config):
+        for attr in ("pad_token_id", "eos_token_id", "bos_token_id", "decoder_start_token_id"):
+            value = getattr(config, attr, None)
+            if isinstance(value, int):
+                setattr(config, attr, old_to_new[value])
+            elif isinstance(value, list):
+                setattr(config, attr, [old_to_new[v] for v in value])
+    model.tie_weights()
+
+
+def _load(model_path: str) -> Tuple[Any, Any]:
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    model.eval()
+    return tokenizer, model
+
+
+def _encode(tokenizer, texts: List[str], source_lang: str, target_lang: str, max_length: int) -> Dict[str, Any]:
+    return tokenizer(
+        [format_input(text, source_lang, target_lang) for text in texts],
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=max_length
+    )
+
+
+def translate_sample(model_path: str, texts: List[str], num_beams: int, max_length: int) -> List[str]:
+    """English to Tamil translations used as the Tamil side of the speed sample"""
+    tokenizer, model = _load(model_path)
+    with torch.no_grad():
+        outputs = model.generate(
+            **_encode(tokenizer, texts, "en", "ta", max_length), num_beams=num_beams, max_length=max_length
+        )
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+def measure_decode_speed(
+    model_path: str,
+    texts_by_pair: Dict[Tuple[str, str], List[str]],
+    num_beams: int,
+    max_length: int
+) -> Dict[str, Any]:
+    """Time generation for each language pair on the same input sentences
+    
+    ms per sentence compares models fairly. ms per generated token does not,
+    since a trimmed tokenizer may split the same output into more tokens.
+    """
+    tokenizer, model = _load(model_path)
+    report: Dict[str, Any] = {}
+    for (source_lang, target_lang), texts in texts_by_pair.items():
+        inputs = _encode(tokenizer, texts, source_lang, target_lang, max_length)
+        with torch.no_grad():
+            # Warm up
+            model.generate(**inputs, num_beams=num_beams, max_length=max_length)
+            start_time = time.perf_counter()
+            outputs = model.generate(**inputs, num_beams=num_beams, max_length=max_length)
+            elapsed = time.perf_counter() - start_time
+        
+        generated = int((outputs != model.config.pad_token_id).sum())
+        report[f"{source_lang}-{target_lang}"] = {
+            "sentences": len(texts),
+            "generated_tokens": generated,
+            "total_ms": elapsed * 1000,
+            "ms_per_sentence": elapsed * 1000 / max(len(texts), 1),
+            "ms_per_token": elapsed * 1000 / max(generated, 1)
+        }
+    
+    pairs = list(report.values())
+    total_ms = sum(pair["total_ms"] for pair in pairs)
+    report["ms_per_sentence"] = total_ms / max(sum(pair["sentences"] for pair in pairs), 1)
+    report["ms_per_token"] = total_ms / max(sum(pair["generated_tokens"] for pair in pairs), 1)
+    return report
+
+
+def _parameter_bytes(model) -> int:
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Trim the model vocabulary to tokens used by a corpus")
+    parser.add_argument("--model-path", required=True, help="Model directory to trim")
+    parser.add_argument("--corpus", type=Path, nargs="+", required=True, help="Corpus files (.txt, .tsv or .jsonl)")
+    parser.add_argument("--output", type=Path, required=True, help="Directory for the trimmed model")
+    parser.add_argument("--min-count", type=int, default=1, help="Drop tokens seen fewer times than this")
+    parser.add_argument("--test-file", type=Path, default=None, help="Parallel test file for the BLEU comparison")
+    parser.add_argument("--num-beams", type=int, default=4)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--report", type=Path, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    
+    tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    model = AutoModelForSeq2SeqLM.from_pretrained(args.model_path)
+    if not tokenizer.is_fast or json.loads(tokenizer.backend_tokenizer.to_str())["model"]["type"] != "Unigram":
+        print("Only fast Unigram (SentencePiece) tokenizers are supported")
+        return 1
+    
+    counts: Counter = Counter()
+    for corpus in args.corpus:
+        counts.update(collect_token_counts(tokenizer, read_corpus(corpus)))
+    kept_ids = select_vocabulary(tokenizer, counts, args.min_count)
+    original_vocab_size = model.config.vocab_size
+    original_bytes = _parameter_bytes(model)
+    
+    shrink_model(model, kept_ids)
+    args.output.mkdir(parents=True, exist_ok=True)
+    model.save_pretrained(args.output)
+    tokenizer.save_pretrained(args.output)
+    remap_tokenizer_files(args.output, kept_ids)
+    (args.output / VOCAB_MAP_FILE).write_text(
+        json.dumps({"original_vocab_size": original_vocab_size, "kept_ids": kept_ids}),
+        encoding="utf-8"
+    )
+    
+    report: Dict[str, Any] = {
+        "original_vocab_size": original_vocab_size,
+        "trimmed_vocab_size": len(kept_ids),
+        "original_parameter_mb": original_bytes / 1024 / 1024,
+        "trimmed_parameter_mb": _parameter_bytes(model) / 1024 / 1024
+    }
+    print(
+        f"Vocabulary {original_vocab_size} -> {len(kept_ids)} tokens, "
+        f"parameters {report['original_parameter_mb']:.1f}MB -> {report['trimmed_parameter_mb']:.1f}MB"
+    )
+    del model
+    
+    # Both models translate the same sentences in both directions
+    sample = {("en", "ta"): DEFAULT_WORKLOAD}
+    sample[("ta", "en")] = translate_sample(args.model_path, DEFAULT_WORKLOAD, args.num_beams, args.max_length)
+    original_speed = measure_decode_speed(args.model_path, sample, args.num_beams, args.max_length)
+    trimmed_speed = measure_decode_speed(str(args.output), sample, args.num_beams, args.max_length)
+    report["decode"] = {
+        "original": original_speed,
+        "trimmed": trimmed_speed,
+        "speedup": original_speed["ms_per_sentence"] / trimmed_speed["ms_per_sentence"],
+        "speedup_per_token": original_speed["ms_per_token"] / trimmed_speed["ms_per_token"]
+    }
+    for source_lang, target_lang in LANGUAGE_PAIRS:
+        pair = f"{source_lang}-{target_lang}"
+        print(
+            f"Decode {pair} {original_speed[pair]['ms_per_sentence']:.1f} -> "
+            f"{trimmed_speed[pair]['ms_per_sentence']:.1f} ms/sentence, "
+            f"{original_speed[pair]['ms_per_token']:.2f} -> {trimmed_speed[pair]['ms_per_token']:.2f} ms/token"
+        )
+    print(
+        f"Decode speedup {report['decode']['speedup']:.2f}x per sentence "
+        f"({report['decode']['speedup_per_token']:.2f}x per token)"
+    )
+    
+    if args.test_file:
+        from app.tools.evaluate import EvalConfig, compare_results, evaluate_config, load_parallel_file
+        
+        sources, references = load_parallel_file(args.test_file)
+        results = [
+            evaluate_config(
+                EvalConfig(name=name, model_path=path, num_beams=args.num_beams, max_length=args.max_length),
+                sources,
+                references
+            )
+            for name, path in (("original", args.model_path), ("trimmed", str(args.output)))
+        ]
+        comparison = compare_results(*results, max_bleu_drop=float("inf"), max_chrf_drop=float("inf"))
+        report["quality"] = {
+            "original_bleu": results[0]["bleu"],
+            "trimmed_bleu": results[1]["bleu"],
+            "bleu_delta": comparison["bleu_delta"],
+            "chrf_delta": comparison["chrf_delta"]
+        }
+        print(f"BLEU {results[0]['bleu']:.2f} -> {results[1]['bleu']:.2f} ({comparison['bleu_delta']:+.2f})")
+    
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
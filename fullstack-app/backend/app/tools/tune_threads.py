@@ -0,0 +1,240 @@
+"""
+CPU threading auto-tuner
+
+Sweeps worker count, torch threads per worker and batch size against the
+benchmark workload on this machine. Every trial starts real worker processes,
+each pinned to its own cores, and measures their aggregate throughput. The
+best configuration is written to TUNING_FILE, which TranslationService reads
+at startup for any CPU setting that is not configured explicitly.
+
+Usage:
+    python -m app.tools.tune_threads --workers 1,2,4 --threads 1,2,4 \\
+        --batch-sizes 1,4,8 --requests 64 --output tuning.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.cpu import AFFINITY_MODES, available_cpus, configure_cpu, numa_nodes
+from app.utils.stats import summarize_latencies
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _worker(
+    worker_index: int,
+    workers: int,
+    threads: int,
+    interop_threads: int,
+    batch_size: int,
+    affinity: Optional[str],
+    texts: List[str],
+    options: Dict[str, Any],
+    barrier,
+    results
+) -> None:
+    """Run one worker's share of the workload in a fresh process"""
+    # Imported here so the parent process never initializes torch thread pools
+    from app.services.translation import TranslationService
+    from app.tools.benchmark import run_workload
+    
+    try:
+        configure_cpu(
+            num_threads=threads,
+            interop_threads=interop_threads,
+            affinity=affinity,
+            workers=workers,
+            worker_index=worker_index
+        )
+        service = TranslationService(model_path=options["model_path"], device="cpu", batch_size=batch_size)
+        service.load_model()
+        run_workload(service, texts[:batch_size], batch_size, options["num_beams"], options["max_length"])
+    except Exception as e:
+        barrier.abort()
+        results.put({"worker_index": worker_index, "error": str(e)})
+        return
+    
+    # Start measuring only once every worker has loaded and warmed up
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        results.put({"worker_index": worker_index, "error": "another worker failed to start"})
+        return
+    try:
+        result = run_workload(service, texts, batch_size, options["num_beams"], options["max_length"])
+    except Exception as e:
+        results.put({"worker_index": worker_index, "error": str(e)})
+        return
+    result["worker_index"] = worker_index
+    results.put(result)
+
+
+def _collect_results(processes: List[Any], results, timeout_s: float) -> List[Dict[str, Any]]:
+    """One result per worker, or an error for workers that died or ran out of time"""
+    worker_results: Dict[int, Dict[str, Any]] = {}
+    deadline = time.monotonic() + timeout_s
+    while len(worker_results) < len(processes):
+        try:
+            result = results.get(timeout=1.0)
+            worker_results[result["worker_index"]] = result
+            continue
+        except queue.Empty:
+            pass
+        # A killed worker (OOM, segfault) never posts a result
+        for index, process in enumerate(processes):
+            if index not in worker_results and process.exitcode not in (None, 0):
+                error = f"worker exited with code {process.exitcode}"
+                worker_results[index] = {"worker_index": index, "error": error}
+        if time.monotonic() >= deadline:
+            for index in range(len(processes)):
+                error = f"no result after {timeout_s:.0f}s"
+                worker_results.setdefault(index, {"worker_index": index, "error": error})
+    return [worker_results[index] for index in range(len(processes))]
+
+
+def run_trial(
+    workers: int,
+    threads: int,
+    batch_size: int,
+    texts: List[str],
+    options: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Measure aggregate throughput of one (workers, threads, batch_size) setting"""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    share = max(len(texts) // workers, batch_size)
+    
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(
+                index, workers, threads, options["interop_threads"], batch_size,
+                options["affinity"], texts[index * share:(index + 1) * share] or texts[:share],
+                options, barrier, results
+            )
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    worker_results = _collect_results(processes, results, options["trial_timeout_s"])
+    for process in processes:
+        # Workers of a failed trial may still be waiting at the barrier or decoding
+        if any("error" in r for r in worker_results) and process.is_alive():
+            process.terminate()
+        process.join()
+    
+    trial: Dict[str, Any] = {
+        "workers": workers,
+        "threads_per_worker": threads,
+        "interop_threads": options["interop_threads"],
+        "batch_size": batch_size,
+        "affinity": options["affinity"]
+    }
+    errors = [r["error"] for r in worker_results if "error" in r]
+    if errors:
+        trial["error"] = errors[0]
+        return trial
+    
+    sentences = sum(r["sentences"] for r in worker_results)
+    wall_time = max(r["total_time_s"] for r in worker_results)
+    latencies = [latency for r in worker_results for latency in r["latencies_ms"]]
+    trial.update({
+        "sentences_per_sec": sentences / wall_time if wall_time > 0 else 0.0,
+        "batch_latency": summarize_latencies(latencies)
+    })
+    return trial
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tune CPU workers, threads and batch size for this machine")
+    parser.add_argument("--model-path", default=None, help="Model directory, defaults to MODEL_PATH")
+    parser.add_argument("--test-file", type=Path, default=None, help="Source sentences (.txt, .tsv or .jsonl)")
+    parser.add_argument("--workers", type=_parse_ints, default=None, help="Worker counts to try, e.g. 1,2,4")
+    parser.add_argument("--threads", type=_parse_ints, default=None, help="Threads per worker to try")
+    parser.add_argument("--batch-sizes", type=_parse_ints, default=[1, 4, 8], help="Batch sizes to try")
+    parser.add_argument("--interop-threads", type=int, default=1, help="Inter-op threads per worker")
+    parser.add_argument("--affinity", choices=AFFINITY_MODES, default="cores", help="How workers are pinned")
+    parser.add_argument("--no-affinity", action="store_true", help="Do not pin workers to cores")
+    parser.add_argument("--requests", type=int, default=64, help="Sentences per trial, split across workers")
+    parser.add_argument("--num-beams", type=int, default=settings.DEFAULT_NUM_BEAMS)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Reject settings with slower p95 batches")
+    parser.add_argument("--allow-oversubscribe", action="store_true", help="Also try workers x threads > CPUs")
+    parser.add_argument("--trial-timeout", type=float, default=1800.0, help="Give up on a trial after this many seconds")
+    parser.add_argument("--output", type=Path, default=Path(settings.TUNING_FILE))
+    args = parser.parse_args(argv)
+    
+    from app.tools.benchmark import load_workload
+    
+    cpu_count = len(available_cpus())
+    worker_counts = args.workers or sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+    thread_counts = args.threads or sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+    texts = load_workload(args.requests, args.test_file)
+    options = {
+        "model_path": args.model_path,
+        "num_beams": args.num_beams,
+        "max_length": args.max_length,
+        "interop_threads": args.interop_threads,
+        "affinity": None if args.no_affinity else args.affinity,
+        "trial_timeout_s": args.trial_timeout
+    }
+    
+    trials = []
+    for workers in worker_counts:
+        for threads in thread_counts:
+            if workers * threads > cpu_count and not args.allow_oversubscribe:
+                continue
+            for batch_size in args.batch_sizes:
+                trial = run_trial(workers, threads, batch_size, texts, options)
+                trials.append(trial)
+                if "error" in trial:
+                    print(f"workers={workers} threads={threads} batch={batch_size} failed: {trial['error']}")
+                    continue
+                print(
+                    f"workers={workers} threads={threads} batch={batch_size} "
+                    f"sent/s={trial['sentences_per_sec']:.2f} "
+                    f"p95={trial['batch_latency']['p95_ms']:.1f}ms"
+                )
+    
+    candidates = [
+        t for t in trials
+        if "error" not in t and (args.max_p95_ms is None or t["batch_latency"]["p95_ms"] <= args.max_p95_ms)
+    ]
+    if not candidates:
+        print("No configuration met the constraints")
+        return 1
+    
+    best = max(candidates, key=lambda t: t["sentences_per_sec"])
+    report = {
+        "best": best,
+        "trials": trials,
+        "host": {
+            "platform": platform.platform(),
+            "cpus": cpu_count,
+            "numa_nodes": len(numa_nodes())
+        },
+        "workload": {"requests": args.requests, "num_beams": args.num_beams, "max_length": args.max_length},
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"Best: workers={best['workers']} threads={best['threads_per_worker']} "
+        f"batch={best['batch_size']} sent/s={best['sentences_per_sec']:.2f} -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Tests for placeholder masking of untranslatable spans
+"""
+import pytest
+
+from app.services.masking import MAX_PLACEHOLDERS, find_spans, mask_text, placeholder, restore
+
+
+@pytest.mark.parametrize("text", [
+    "Visit https://example.com/docs?page=2 for details.",
+    "Write to support@example.org before 10:30 tomorrow.",
+    "Run `pip install -r requirements.txt` first.",
+    "Prices rose by 3.5% to 1,200 rupees.",
+    "The word வணக்கம் means hello.",
+    "Pages 10-20 cover the results.",
+])
+def test_mask_restore_round_trip(text):
+    masked = mask_text(text, "ta")
+    
+    assert masked.spans
+    assert not masked.passthrough
+    assert restore(masked.text, masked) == text
+
+
+def test_spans_are_replaced_in_order():
+    masked = mask_text("Call 077 or mail a@b.com today", "ta")
+    
+    assert masked.text == f"Call {placeholder(0)} or mail {placeholder(1)} today"
+    assert masked.spans == ["077", "a@b.com"]
+    assert masked.kinds == ["number", "email"]
+
+
+def test_text_without_spans_is_unchanged():
+    masked = mask_text("Thank you for your help.", "ta")
+    
+    assert masked.text == "Thank you for your help."
+    assert masked.spans == []
+    assert restore("நன்றி", masked) == "நன்றி"
+
+
+@pytest.mark.parametrize("text", ["COVID-19 cases rose", "The A-1 road", "covid19 is spreading"])
+def test_numbers_inside_words_are_not_masked(text):
+    assert mask_text(text, "ta").spans == []
+
+
+@pytest.mark.parametrize("text, target_lang", [
+    ("https://example.com", "ta"),
+    ("12.5%", "ta"),
+    ("வணக்கம் நண்பரே", "ta"),
+    ("Good morning", "en"),
+])
+def test_nothing_to_translate_is_passthrough(text, target_lang):
+    assert mask_text(text, target_lang).passthrough
+
+
+def test_restore_appends_dropped_placeholders():
+    masked = mask_text("See https://example.com now", "ta")
+    
+    assert restore("இப்போது பாருங்கள்", masked) == "இப்போது பாருங்கள் https://example.com"
+
+
+def test_restore_removes_invented_placeholders():
+    masked = mask_text("Call 077 now", "ta")
+    
+    assert restore(f"{placeholder(0)} {placeholder(5)} அழைக்கவும்", masked) == "077 அழைக்கவும்"
+
+
+def test_url_stops_before_trailing_punctuation():
+    spans = find_spans("Go to www.example.com.", "ta")
+    
+    assert spans == [(6, 21, "url")]
+
+
+def test_placeholders_are_capped():
+    text = " ".join(str(i) for i in range(MAX_PLACEHOLDERS + 20)) + " apples"
+    masked = mask_text(text, "ta")
+    
+    assert len(masked.spans) == MAX_PLACEHOLDERS
+    assert restore(masked.text, masked) == text
+
+
+@pytest.mark.parametrize("text", [
+    "Run `a  =  1` now",
+    "Example:\n```\ndef f():\n    return 1\n```\nThat is all.",
+])
+def test_restore_keeps_whitespace_inside_code(text):
+    masked = mask_text(text, "ta")
+    
+    assert masked.kinds == ["code"]
+    assert restore(masked.text, masked) == text
+    assert restore(masked.text.replace(" ", "  "), masked) == masked.text.replace(placeholder(0), masked.spans[0])
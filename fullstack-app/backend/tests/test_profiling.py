@@ -0,0 +1,34 @@
+"""
+Tests for on-demand profiling of the translation hot path
+"""
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.services.profiling import Profiler  # noqa: E402
+
+
+def test_profiled_request_thread_reports_operators(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    
+    def request():
+        while not profiler.active:
+            time.sleep(0.01)
+        with profiler.stage("generate"):
+            torch.matmul(torch.ones(64, 64), torch.ones(64, 64))
+        profiler.request_done()
+    
+    # Translations run on executor threads, not the thread that starts the session
+    thread = threading.Thread(target=request)
+    thread.start()
+    summary = profiler.run(duration_s=30, max_requests=1, top=100)
+    thread.join()
+    
+    names = [operator["name"] for operator in summary["top_operators"]]
+    assert summary["profiled_stages"] == 1
+    assert "aten::matmul" in names or "aten::mm" in names
+    assert "translation.generate" in names
+    assert (tmp_path / f"profile-{summary['session_id']}.json").stat().st_size > 0
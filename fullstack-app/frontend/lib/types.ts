@@ -5,6 +5,15 @@ export interface TranslationRequest {
   target_language: string;
   num_beams?: number;
   max_length?: number;
+  timeout_ms?: number;
+  num_return_sequences?: number;
+  return_scores?: boolean;
+}
+
+export interface TranslationHypothesis {
+  text: string;
+  score: number;
+  confidence: number;
 }
 
 export interface TranslationResponse {
@@ -14,6 +23,8 @@ export interface TranslationResponse {
   target_language: string;
   num_beams: number;
   confidence_score?: number;
+  sequence_score?: number;
+  alternatives?: TranslationHypothesis[];
   processing_time_ms: number;
   model_info: {
     name: string;
@@ -29,6 +40,9 @@ export interface BatchTranslationRequest {
   target_language: string;
   num_beams?: number;
   max_length?: number;
+  timeout_ms?: number;
+  num_return_sequences?: number;
+  return_scores?: boolean;
 }
 
 export interface BatchTranslationResponse {
@@ -58,6 +72,15 @@ export interface HealthResponse {
     parameters?: number;
     trainable_parameters?: number;
   };
+  memory?: {
+    budget_mb: number | null;
+    reserved_mb: number;
+    peak_reserved_mb: number;
+    active_reservations: number;
+    waiting: number;
+    rejected: number;
+    oom_splits: number;
+  };
 }
 
 export interface ApiError {